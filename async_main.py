@@ -0,0 +1,121 @@
+import logging
+from typing import List, Optional
+
+from config.constants import ASYNC_CONTRACT_CONCURRENCY, ASYNC_HOLDER_CONCURRENCY, ASYNC_MAX_CONCURRENCY
+from services.solscan.async_solscan_engine import AsyncSolscanEngine
+from services.solscan.solscan_engine import HolderPagesError
+from services.solscan.models import TokenHolder
+from services.twitter.async_twitter_engine import AsyncTwitterEngine
+from utils.eligibility import eligibility_engine, eligible_result, not_eligible_result
+from utils.owner_cache import OwnerResult, OwnerResultCache
+from utils.async_http import AsyncHttpClient
+from utils.async_scheduler import BoundedScheduler
+from utils.async_wallets import AsyncBalanceChecker
+from utils.progress import PipelineMetrics
+from utils.proxy_manager import ProxyManager
+from utils.result_sink import ResultSink
+from utils.run_journal import RunJournal, resumable_pages_async
+
+logger = logging.getLogger('twitter_parser')
+
+
+async def resolve_owner(owner: str, twitter_engine: AsyncTwitterEngine,
+                        balance_checker: AsyncBalanceChecker) -> OwnerResult:
+    search_response = await twitter_engine.get_latest_posts(query=owner)
+    verdict = eligibility_engine.evaluate(owner, search_response)
+    if verdict.entry is None:
+        return not_eligible_result(owner, verdict)
+    entry = verdict.entry
+
+    balances, usd_values = await balance_checker.get_wallet_balance(owner)
+    total_usd = sum(usd_values.values()) if usd_values else 0
+    logger.debug(f"✨ Найден: @{entry.tweet.author.screen_name} ({owner[:8]}...) | Баланс: ${total_usd:.2f}")
+    return eligible_result(owner, entry, total_usd)
+
+
+async def process_holder(holder: TokenHolder, twitter_engine: AsyncTwitterEngine,
+                         balance_checker: AsyncBalanceChecker, owner_cache: OwnerResultCache,
+                         sink: ResultSink, metrics: PipelineMetrics) -> None:
+    try:
+        logger.debug(f"Проверка холдера: {holder.owner}")
+        result, _ = await owner_cache.get_or_compute_async(
+            holder.owner,
+            lambda: resolve_owner(holder.owner, twitter_engine, balance_checker)
+        )
+        sink.add(result)
+
+        metrics.add('processed_holders')
+        metrics.add('eligible' if result.eligible else 'not_eligible')
+
+    except Exception as holder_error:
+        logger.error(f"Ошибка при обработке холдера {holder.owner}: {str(holder_error)}", exc_info=True)
+
+
+async def process_contract(contract_address: str, solscan_engine: AsyncSolscanEngine,
+                           twitter_engine: AsyncTwitterEngine, balance_checker: AsyncBalanceChecker,
+                           owner_cache: OwnerResultCache, holder_scheduler: BoundedScheduler, sink: ResultSink,
+                           metrics: PipelineMetrics, journal: Optional[RunJournal] = None) -> None:
+    try:
+        logger.info(f"Обработка контракта: {contract_address}")
+        holders_received = 0
+
+        # Холдеры уходят в планировщик сразу по мере получения страниц;
+        # submit() блокируется при заполнении, ограничивая память
+        pages = resumable_pages_async(
+            journal, contract_address,
+            lambda start_page: solscan_engine.iter_holder_pages(contract_address, 100, start_page)
+        )
+        try:
+            async for page in pages:
+                holders_received += len(page)
+                metrics.add('total_holders', len(page))
+
+                for holder in page:
+                    await holder_scheduler.submit(
+                        process_holder, holder, twitter_engine, balance_checker, owner_cache,
+                        sink, metrics
+                    )
+        except HolderPagesError as e:
+            # Контракт не отмечается завершённым: --resume дополучит страницы
+            logger.error(f"Пагинация прервана, получено {holders_received} холдеров: {str(e)}")
+            return
+
+        if not holders_received:
+            logger.warning(f"Не удалось получить холдеров для контракта {contract_address}")
+            return
+
+        if journal is not None:
+            journal.finish_contract(contract_address)
+        metrics.add('processed_contracts')
+
+    except Exception as e:
+        logger.error(f"Ошибка при обработке контракта {contract_address}: {str(e)}", exc_info=True)
+
+
+async def run_pipeline(contract_addresses: List[str], proxy_manager: ProxyManager, owner_cache: OwnerResultCache,
+                       sink: ResultSink, metrics: PipelineMetrics, journal: Optional[RunJournal] = None) -> dict:
+    """Обработка всех контрактов в одном цикле событий.
+
+    Контракты и холдеры планируются через BoundedScheduler, а общее число
+    HTTP-запросов в полёте ограничено AsyncHttpClient.
+    """
+    async with AsyncHttpClient(max_concurrency=ASYNC_MAX_CONCURRENCY) as http_client:
+        twitter_engine = AsyncTwitterEngine(http_client, proxy_manager=proxy_manager)
+        solscan_engine = AsyncSolscanEngine(http_client, proxy_manager=proxy_manager)
+        balance_checker = AsyncBalanceChecker(http_client)
+
+        contract_scheduler = BoundedScheduler(ASYNC_CONTRACT_CONCURRENCY)
+        holder_scheduler = BoundedScheduler(ASYNC_HOLDER_CONCURRENCY)
+
+        for contract_address in contract_addresses:
+            await contract_scheduler.submit(
+                process_contract, contract_address, solscan_engine, twitter_engine,
+                balance_checker, owner_cache, holder_scheduler, sink, metrics, journal
+            )
+
+        await contract_scheduler.join()
+        await holder_scheduler.join()
+
+    stats = metrics.snapshot()
+    logger.info(f"Завершена асинхронная обработка. Статистика: {stats}")
+    return stats
@@ -0,0 +1,108 @@
+"""Бенчмарк пропускной способности конвейера холдеров в зависимости от числа потоков.
+
+Сеть заменена задержками: поиск в Twitter, расчёт баланса (RPC + Helius +
+цены) и страницы Solscan. Сравниваются баланс внутри Twitter-воркера
+(прежняя схема) и отдельная стадия BalanceStage.
+
+Запуск: python benchmarks/bench_pipeline_threads.py [число_холдеров]
+"""
+import os
+import sys
+import time
+from concurrent.futures import Future
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from services.solscan.models import TokenHolder
+from services.twitter.models import TimelineEntry, Tweet, TwitterSearchResponse, User
+from utils.balance_stage import BalanceStage
+from utils.eligibility import EligibilityEngine
+from utils.owner_cache import OwnerResultCache
+from utils.progress import PipelineMetrics
+from utils.result_sink import MemorySink
+
+TWITTER_LATENCY = 0.02
+BALANCE_LATENCY = 0.15
+PAGE_LATENCY = 0.01
+ELIGIBLE_EVERY = 3
+OWNER = '5cvQpjBpobuLEKf2myqpwrkcX4u1ct1XuEqmgcubAV7f'
+
+
+class FakeSolscanEngine:
+    holders = 0
+
+    def __init__(self, proxy_manager=None):
+        pass
+
+    def iter_holder_pages(self, contract_address, page_size=100, start_page=1):
+        for start in range(0, self.holders, page_size):
+            time.sleep(PAGE_LATENCY)
+            yield [
+                TokenHolder(address='a', amount=1, decimals=0, owner=f'{contract_address}-{i}', rank=i, withheldAmount=0)
+                for i in range(start, min(start + page_size, self.holders))
+            ]
+
+
+class FakeTwitterEngine:
+    def __init__(self, proxy_manager=None):
+        pass
+
+    def get_latest_posts(self, query):
+        time.sleep(TWITTER_LATENCY)
+        if int(query.rsplit('-', 1)[1]) % ELIGIBLE_EVERY:
+            return TwitterSearchResponse([])
+        author = User('1', '1', 'name', 'screen', '', 10, 1, True)
+        return TwitterSearchResponse([TimelineEntry('e', Tweet('1', f'wallet {OWNER}', '', author, 0, 0, 0, 0))])
+
+
+class FakeBalanceChecker:
+    def get_wallets_balances(self, owners):
+        # Пачка обходится в одну задержку: batch-запросы к RPC и цены одним проходом
+        time.sleep(BALANCE_LATENCY)
+        return {owner: ({'SOL': 1.0}, {'SOL': 100.0}) for owner in owners}
+
+
+class InlineBalanceStage(BalanceStage):
+    """Прежняя схема: баланс считается в самом Twitter-воркере"""
+
+    def submit(self, owner, entry):
+        future = Future()
+        self._enrich_batch([(owner, entry, future)])
+        return future
+
+
+def run(stage_cls, twitter_workers: int, holders: int) -> float:
+    main.TWITTER_WORKERS_PER_CHUNK = twitter_workers
+    FakeSolscanEngine.holders = holders
+    sink = MemorySink()
+    stage = stage_cls(FakeBalanceChecker(), max_workers=twitter_workers * 4)
+    started = time.perf_counter()
+    with stage:
+        main.process_contract_chunk(
+            ['contract'], None, OwnerResultCache(), stage, sink, PipelineMetrics(1)
+        )
+    elapsed = time.perf_counter() - started
+    assert len(sink.eligible_holders) + len(sink.not_eligible_holders) == holders
+    return holders / elapsed
+
+
+def main_bench():
+    holders = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    main.SolscanEngine = FakeSolscanEngine
+    main.TwitterEngine = FakeTwitterEngine
+    # Владельцы в замере синтетические — достаточно упоминания SOL-адреса
+    main.eligibility_engine = EligibilityEngine(require_owner_match=False)
+
+    print(f"Холдеров: {holders}, подходит каждый {ELIGIBLE_EVERY}-й, "
+          f"Twitter {TWITTER_LATENCY * 1000:.0f} мс, баланс {BALANCE_LATENCY * 1000:.0f} мс")
+    print(f"{'потоков':>8} | {'баланс в воркере':>18} | {'стадия баланса':>16} | ускорение")
+    for workers in (1, 2, 4, 8, 16):
+        inline = run(InlineBalanceStage, workers, holders)
+        staged = run(BalanceStage, workers, holders)
+        print(f"{workers:>8} | {inline:>12.1f} х/с | {staged:>10.1f} х/с | {staged / inline:.2f}x")
+
+
+if __name__ == '__main__':
+    main_bench()
@@ -0,0 +1,106 @@
+"""Бенчмарк RpcEndpointPool на локальных JSON-RPC заглушках.
+
+Поднимаются два сервера: «быстрый» с редкими долгими ответами и
+«стабильный» чуть медленнее. Сравниваются задержки одного эндпоинта и пула
+с хеджированием, затем проверяется переключение, когда быстрый отвечает 503.
+
+Запуск: python benchmarks/bench_rpc_pool.py [число_запросов]
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_client import SessionPool
+from utils.rpc_pool import RpcEndpointPool, RpcError
+
+PAYLOAD = {"jsonrpc": "2.0", "id": 1, "method": "getBalance", "params": ["5cvQpjBpobuLEKf2myqpwrkcX4u1ct1XuEqmgcubAV7f"]}
+
+
+def make_handler(latency: float, tail_latency: float, tail_share: float, state: dict):
+    rnd = random.Random(42)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if state.get('down'):
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            time.sleep(tail_latency if rnd.random() < tail_share else latency)
+            request = json.loads(body)
+            data = json.dumps({"jsonrpc": "2.0", "id": request.get('id'), "result": {"value": 1000000000}}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(handler) -> str:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def measure(pool: RpcEndpointPool, requests: int) -> dict:
+    latencies, errors = [], 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        try:
+            pool.call(PAYLOAD, 'rpc.getBalance')
+        except RpcError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    if not latencies:
+        return {'errors': errors}
+
+    def pick(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+    return {'p50': pick(50), 'p95': pick(95), 'p99': pick(99), 'max': latencies[-1] * 1000, 'errors': errors}
+
+
+def report(title: str, result: dict) -> None:
+    if 'p50' not in result:
+        print(f"{title:<36} ошибок: {result['errors']}")
+        return
+    print(f"{title:<36} p50 {result['p50']:6.1f} мс | p95 {result['p95']:6.1f} мс | "
+          f"p99 {result['p99']:6.1f} мс | max {result['max']:6.1f} мс | ошибок {result['errors']}")
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    fast_state = {}
+    fast = serve(make_handler(0.01, 0.3, 0.08, fast_state))
+    stable = serve(make_handler(0.03, 0.03, 0.0, {}))
+    sessions = SessionPool()
+
+    report("Один эндпоинт", measure(RpcEndpointPool([fast], hedge=False, session_pool=sessions), requests))
+
+    hedged = RpcEndpointPool([fast, stable], hedge=True, session_pool=sessions)
+    report("Пул с хеджированием", measure(hedged, requests))
+    print(f"  статистика: {hedged.stats()}")
+
+    fast_state['down'] = True
+    failover = RpcEndpointPool([fast, stable], hedge=False, session_pool=sessions)
+    report("Переключение (быстрый отдаёт 503)", measure(failover, requests))
+    print(f"  статистика: {failover.stats()}")
+
+
+if __name__ == '__main__':
+    main()
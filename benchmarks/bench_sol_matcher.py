@@ -0,0 +1,74 @@
+"""Бенчмарк классификации твитов: прежний regexp_check_sol против SolAddressMatcher.
+
+Запуск: python benchmarks/bench_sol_matcher.py [число_твитов]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import SOL_BLACKLIST, SolAddressMatcher
+
+BASE58 = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+WORDS = ('gm', 'wagmi', 'solana', 'airdrop', 'pump', 'moon', 'send', 'giveaway', 'ngmi', 'lfg', 'degen', 'chart')
+
+
+def legacy_check(text: str) -> bool:
+    """Прежняя реализация: шаблоны собираются при каждом вызове"""
+    blacklist_pattern = '|'.join(SOL_BLACKLIST)
+    if re.search(blacklist_pattern, text.lower()):
+        return False
+    base58_chars = r'[1-9A-HJ-NP-Za-km-z]'
+    patterns = [
+        rf'{base58_chars}{{32,44}}',
+        rf'sol:{base58_chars}{{32,44}}',
+        rf'solscan\.io/account/{base58_chars}{{32,44}}',
+        rf'explorer\.solana\.com/address/{base58_chars}{{32,44}}'
+    ]
+    combined_pattern = '|'.join(f'(?:{pattern})' for pattern in patterns)
+    final_pattern = rf'\b({combined_pattern})\b'
+    return bool(re.search(final_pattern, text, re.IGNORECASE))
+
+
+def make_corpus(size: int, seed: int = 42) -> list:
+    rnd = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = [rnd.choice(WORDS) for _ in range(rnd.randint(5, 40))]
+        kind = rnd.random()
+        if kind < 0.3:
+            address = ''.join(rnd.choice(BASE58) for _ in range(rnd.randint(32, 44)))
+            prefix = rnd.choice(('', 'sol:', 'https://solscan.io/account/', 'explorer.solana.com/address/'))
+            words.insert(rnd.randrange(len(words)), prefix + address)
+        if kind > 0.8:
+            words.insert(rnd.randrange(len(words)), rnd.choice(('scam', 'who dis', 'this  wallet', 'Beware', 'bot')))
+        corpus.append(' '.join(words))
+    return corpus
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    corpus = make_corpus(size)
+    matcher = SolAddressMatcher()
+
+    started = time.perf_counter()
+    legacy = [legacy_check(text) for text in corpus]
+    legacy_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matches = matcher.classify_many(corpus)
+    matcher_time = time.perf_counter() - started
+
+    assert legacy == [match.eligible for match in matches], "Результаты классификации расходятся"
+
+    print(f"твитов: {size}, подходящих: {sum(legacy)}")
+    print(f" legacy: {legacy_time / size * 1e6:6.2f} мкс/твит")
+    print(f"matcher: {matcher_time / size * 1e6:6.2f} мкс/твит (с извлечением адресов)")
+    print(f"ускорение: x{legacy_time / matcher_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Бенчмарк времени запуска: импорт модулей по данным python -X importtime.
+
+Каждый модуль импортируется в отдельном чистом процессе несколько раз;
+выводятся медиана суммарного времени импорта, время процесса целиком и
+самые тяжёлые зависимости. Отдельно измеряется первое чтение заголовков
+Twitter из config/twitter_headers.jsonl.
+
+Запуск: python benchmarks/bench_startup.py [число_повторов] [модуль ...]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+MODULES = ['config.config', 'services.twitter.twitter_engine', 'utils.wallets', 'async_main', 'main']
+HEAVY = ('rich', 'solana', 'solders', 'pyarrow')
+TOP = 8
+
+
+def import_profile(module: str) -> tuple:
+    """Время процесса и {модуль: (собственное, суммарное)} в микросекундах"""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"Не удалось импортировать {module}:\n{completed.stderr[-2000:]}")
+
+    profile = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return wall, profile
+
+
+def main():
+    args = sys.argv[1:]
+    repeats = int(args.pop(0)) if args and args[0].isdigit() else 5
+    modules = args or MODULES
+
+    print(f"{'Модуль':<34} {'импорт, мс':>11} {'процесс, мс':>12}  тяжёлые зависимости")
+    for module in modules:
+        runs = [import_profile(module) for _ in range(repeats)]
+        cumulative = statistics.median(profile[module][1] for _, profile in runs) / 1000
+        wall = statistics.median(wall for wall, _ in runs) * 1000
+        _, profile = runs[-1]
+        heavy = sorted({name.split('.')[0] for name in profile if name.split('.')[0] in HEAVY})
+        print(f"{module:<34} {cumulative:>11.1f} {wall:>12.1f}  {', '.join(heavy) or '—'}")
+
+    module = modules[-1]
+    _, profile = import_profile(module)
+    print(f"\nСамые тяжёлые импорты {module} (суммарно, мс):")
+    top = sorted(((cumulative, name) for name, (_, cumulative) in profile.items() if name != module), reverse=True)
+    for cumulative, name in top[:TOP]:
+        print(f"  {name:<40} {cumulative / 1000:8.1f}")
+
+    from config.config import load_twitter_headers
+    started = time.perf_counter()
+    headers = load_twitter_headers()
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    load_twitter_headers()
+    cached = time.perf_counter() - started
+    print(f"\nЗаголовки Twitter: {len(headers)} аккаунтов, первое чтение {first * 1000:.2f} мс, "
+          f"из кэша {cached * 1e6:.1f} мкс")
+
+
+if __name__ == '__main__':
+    main()
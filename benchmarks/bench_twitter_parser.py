@@ -0,0 +1,145 @@
+"""Микробенчмарк разбора SearchTimeline: быстрый парсер против прежнего пути через dacite.
+
+Запуск: python benchmarks/bench_twitter_parser.py [число_ответов]
+"""
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dacite import from_dict, Config
+
+from services.twitter import parser
+from services.twitter.models import Tweet, TimelineEntry, TwitterSearchResponse
+
+DACITE_CONFIG = Config(check_types=False, cast=[int, float])
+
+
+def make_tweet_result(i: int, with_visibility: bool = False) -> dict:
+    result = {
+        '__typename': 'Tweet',
+        'rest_id': str(1870000000000000000 + i),
+        'core': {'user_results': {'result': {
+            'id': f'VXNlcjo{i}',
+            'rest_id': str(100000 + i),
+            'legacy': {
+                'name': f'User {i}',
+                'screen_name': f'user_{i}',
+                'description': 'solana degen ' * 5,
+                'followers_count': 1000 + i,
+                'friends_count': 300 + i,
+                'can_dm': i % 2 == 0,
+            },
+        }}},
+        'legacy': {
+            'full_text': f'gm, send to 5cvQpjBpobuLEKf2myqpwrkcX4u1ct1XuEqmgcubAV7f #{i}',
+            'created_at': 'Mon Jan 06 12:00:00 +0000 2025',
+            'reply_count': i % 7,
+            'retweet_count': i % 11,
+            'favorite_count': i % 13,
+            'quote_count': i % 3,
+        },
+    }
+    if with_visibility:
+        return {'__typename': 'TweetWithVisibilityResults', 'tweet': result}
+    return result
+
+
+def make_response(entries: int = 20) -> dict:
+    items = [
+        {
+            'entryId': f'tweet-{i}',
+            'content': {'itemContent': {'tweet_results': {'result': make_tweet_result(i, i % 5 == 0)}}},
+        }
+        for i in range(entries)
+    ]
+    items.append({'entryId': 'cursor-bottom', 'content': {'value': 'DAAC'}})
+    return {'data': {'search_by_raw_query': {'search_timeline': {'timeline': {
+        'instructions': [{'type': 'TimelineAddEntries', 'entries': items}]
+    }}}}}
+
+
+# Прежняя реализация TwitterEngine.parse_search_response — для сравнения
+
+def _dacite_user_data(tweet_data: dict) -> dict:
+    try:
+        user_data = tweet_data['core']['user_results']['result']
+        legacy = user_data['legacy']
+        return {
+            'id': user_data['id'],
+            'rest_id': user_data['rest_id'],
+            'name': legacy['name'],
+            'screen_name': legacy['screen_name'],
+            'description': legacy['description'],
+            'followers_count': legacy['followers_count'],
+            'following_count': legacy['friends_count'],
+            'can_dm': legacy.get('can_dm', False)
+        }
+    except KeyError:
+        user_result = tweet_data.get('user_results', {}).get('result', {})
+        legacy = user_result.get('legacy', {})
+        return {
+            'id': user_result.get('id', ''),
+            'rest_id': user_result.get('rest_id', ''),
+            'name': legacy.get('name', ''),
+            'screen_name': legacy.get('screen_name', ''),
+            'description': legacy.get('description', ''),
+            'followers_count': legacy.get('followers_count', 0),
+            'following_count': legacy.get('friends_count', 0),
+            'can_dm': legacy.get('can_dm', False)
+        }
+
+
+def _dacite_tweet_data(tweet_data: dict, user_dict: dict) -> dict:
+    if 'tweet' in tweet_data:
+        tweet_data = tweet_data['tweet']
+    legacy_data = tweet_data.get('legacy', {})
+    return {
+        'id': tweet_data.get('rest_id', ''),
+        'text': legacy_data.get('full_text', ''),
+        'created_at': legacy_data.get('created_at', ''),
+        'author': user_dict,
+        'reply_count': legacy_data.get('reply_count', 0),
+        'retweet_count': legacy_data.get('retweet_count', 0),
+        'like_count': legacy_data.get('favorite_count', 0),
+        'quote_count': legacy_data.get('quote_count', 0)
+    }
+
+
+def dacite_parse(data: dict) -> TwitterSearchResponse:
+    entries_data = data['data']['search_by_raw_query']['search_timeline']['timeline']['instructions'][0]['entries']
+    timeline_entries = []
+    for entry_data in entries_data:
+        if 'tweet_results' not in entry_data['content'].get('itemContent', {}):
+            continue
+        tweet_data = entry_data['content']['itemContent']['tweet_results']['result']
+        user_dict = _dacite_user_data(tweet_data)
+        tweet = from_dict(data_class=Tweet, data=_dacite_tweet_data(tweet_data, user_dict), config=DACITE_CONFIG)
+        timeline_entries.append(from_dict(
+            data_class=TimelineEntry,
+            data={'entry_id': entry_data['entryId'], 'tweet': tweet},
+            config=DACITE_CONFIG
+        ))
+    return TwitterSearchResponse(entries=timeline_entries)
+
+
+def fast_parse(data: dict) -> TwitterSearchResponse:
+    return TwitterSearchResponse(entries=parser.parse_entries(parser.timeline_entries_data(data)))
+
+
+def main():
+    responses = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    data = make_response()
+    assert dacite_parse(data) == fast_parse(data), "Результаты парсеров расходятся"
+
+    results = {}
+    for name, fn in (('dacite', dacite_parse), ('fast', fast_parse)):
+        best = min(timeit.repeat(lambda: fn(data), number=responses, repeat=5))
+        results[name] = best
+        print(f"{name:>6}: {best / responses * 1e6:8.1f} мкс/ответ ({responses} ответов по 20 твитов)")
+    print(f"ускорение: x{results['dacite'] / results['fast']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
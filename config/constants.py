@@ -3,21 +3,97 @@ CHUNK_SIZE = 5
 MAX_RETRIES = 5
 REQUEST_TIMEOUT = 30
 
+# Настройки потокового конвейера
+HOLDER_QUEUE_SIZE = 200  # холдеров в очереди между Solscan и Twitter
+TWITTER_WORKERS_PER_CHUNK = 4
+BALANCE_MAX_WORKERS = 16  # общий пул стадии баланса для всех чанков
+# Потоковая запись результатов
+CSV_FLUSH_INTERVAL = 5.0  # секунд между flush + fsync
+CSV_FSYNC = True
+CSV_ROTATE_BYTES = 100 * 1024 * 1024  # новая часть файла после 100 МБ
+CSV_QUEUE_SIZE = 10000  # строк в очереди к потоку-писателю
+PARQUET_ROW_GROUP_SIZE = 10000  # строк в одной row group
+PARQUET_COMPRESSION = 'zstd'
+PROGRESS_REFRESH_INTERVAL = 0.5  # секунд между перерисовками прогресса
+# Подходящим считается только твит, где упомянут адрес самого холдера
+ELIGIBILITY_REQUIRE_OWNER_MATCH = True
+OWNER_CACHE_FILE = None  # например 'output/owner_cache.jsonl' для переиспользования между запусками
+RUN_JOURNAL_FILE = 'output/run_journal.sqlite'  # журнал прогона для --resume
+
+# Настройки прокси
+PROXY_MAX_ERRORS = 3  # ошибок до вывода прокси из ротации
+PROXY_DEFAULT_LATENCY = 1.0  # секунд, для ещё не измеренных прокси
+PROXY_STATS_ALPHA = 0.2  # коэффициент сглаживания задержки и доли ошибок
+PROXY_CHECK_URL = 'https://api.twitter.com'
+PROXY_CHECK_TIMEOUT = 10
+PROXY_CHECK_INTERVAL = 300  # секунд между плановыми проверками здоровых прокси
+PROXY_CHECK_WORKERS = 32  # параллельных проверок
+PROXY_QUARANTINE_BASE = 30  # секунд до первой повторной проверки упавшего прокси
+PROXY_QUARANTINE_MAX = 1800
+PROXY_LATENCY_WINDOW = 50  # последних замеров для перцентилей
+
 # Настройки Twitter Parser
 TWITTER_SEARCH_PAGE_SIZE = 20
 TWITTER_MAX_PAGE = 101
-TWITTER_DELAY_BETWEEN_REQUESTS = 1
+TWITTER_ACCOUNT_BUDGET = 50  # запросов на аккаунт, пока x-rate-limit-remaining не известен
+TWITTER_ACCOUNT_COOLDOWN = 60  # секунд паузы после 429 без x-rate-limit-reset
+TWITTER_ACCOUNT_MAX_ERRORS = 7  # ответов 401/403 подряд до отключения аккаунта
+TWITTER_ACCOUNT_MAX_WAIT = 16 * 60  # секунд ожидания свободного аккаунта: окно лимита Twitter 15 минут плюс запас
+TWITTER_ACCOUNT_POLL_INTERVAL = 0.1  # шаг ожидания аккаунта в асинхронном режиме
 
 # Настройки Solscan
 SOLSCAN_PAGE_SIZE = 100
 SOLSCAN_MAX_PAGE = 101
-SOLSCAN_DELAY_BETWEEN_REQUESTS = 1
+
+# Настройки пула HTTP-соединений
+HTTP_POOL_CONNECTIONS = 10  # пулов хостов на одну сессию
+HTTP_POOL_MAXSIZE = 20  # соединений на хост внутри пула
+HTTP_KEEPALIVE = True
+HTTP_KEEPALIVE_TIMEOUT = 60  # секунд простоя до закрытия сессии
+
+# Лимиты запросов: хост -> (запросов в секунду, размер всплеска)
+RATE_LIMITS = {
+    'x.com': (20, 20),
+    'api-v2.solscan.io': (5, 5),
+    'mainnet.helius-rpc.com': (10, 20),
+    'token.jup.ag': (1, 1),
+    'api.coingecko.com': (0.5, 2),
+    'api.jup.ag': (5, 5),
+    'api.raydium.io': (2, 2),
+}
+DEFAULT_RATE_LIMIT = (10, 10)
+PROXY_RATE_LIMIT = (5, 10)  # на каждый прокси
+RATE_LIMIT_DEFAULT_RETRY_AFTER = 5  # секунд после 429 без Retry-After
+ACCOUNT_RATE_LIMITED_HOSTS = ('x.com',)  # x-rate-limit-* по аккаунту, см. utils/headers_manager.py
+
+# JSON-бэкенд: 'auto' (orjson → msgspec → json), 'orjson', 'msgspec' или 'json'
+JSON_BACKEND = 'auto'
+
+# Настройки asyncio-режима
+ASYNC_MAX_CONCURRENCY = 200  # одновременных HTTP-запросов на процесс
+ASYNC_CONTRACT_CONCURRENCY = 10
+ASYNC_HOLDER_CONCURRENCY = 100
 
 # Настройки Wallet Scanner
 WALLET_CACHE_DURATION = 300  # 5 минут в секундах
-WALLET_BATCH_SIZE = 50
-WALLET_MAX_WORKERS = 10
-WALLET_RATE_LIMIT_DELAY = 0.5
+RPC_ACCOUNTS_BATCH_SIZE = 100  # кошельков в одном getMultipleAccounts (лимит RPC)
+RPC_REQUEST_BATCH_SIZE = 20  # запросов getTokenAccountsByOwner в одном JSON-RPC batch (по одному на программу)
+RPC_BATCH_WORKERS = 4  # параллельных batch-запросов; лимит на RPC-хост задаётся в RATE_LIMITS
+# Пул RPC-эндпоинтов (основной USER_CONFIG['SOL_RPC'] и запасные SOL_RPC_FALLBACKS)
+RPC_HEDGE_ENABLED = True  # дублировать запрос на второй эндпоинт, если первый не ответил за p95
+RPC_HEDGE_MIN_DELAY = 0.05  # секунд, не раньше которых отправляется дубль
+RPC_HEDGE_WORKERS = 16
+RPC_LATENCY_WINDOW = 100  # последних замеров задержки на эндпоинт
+RPC_DEFAULT_LATENCY = 1.0  # секунд, пока замеров нет
+RPC_MAX_ERRORS = 3  # ошибок подряд до паузы эндпоинта
+RPC_ENDPOINT_COOLDOWN = 30  # секунд паузы
+BALANCE_BATCH_WINDOW = 0.2  # секунд, которые стадия баланса копит кошельки в пачку
+TOKEN_REGISTRY_FILE = 'solana_tokens.bin'  # бинарный реестр токенов Jupiter, открывается через mmap
+
+# Настройки цен
+PRICE_CACHE_TTL = 60  # секунд жизни цены по mint
+PRICE_BATCH_SIZE = 100  # mint в одном запросе Jupiter ids=
+STABLECOINS = ('USDC', 'USDT')  # цена 1.0, если API не ответили
 
 # Базовые токены
 TOKENS_INFO = {
@@ -43,4 +119,7 @@ JUPITER_PRICE_URL = "https://api.jup.ag/price/v2"
 RAYDIUM_PRICE_URL = "https://api.raydium.io/v2/main/price"
 
 # Solana constants
-TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA" 
\ No newline at end of file
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+TOKEN_2022_PROGRAM_ID = "TokenzQdBNbLqP5VEhdkAS6EPFLC5JFd9UsoNdQHHmd5"
+TOKEN_PROGRAM_IDS = (TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID)  # программы, чьи аккаунты входят в баланс
+SOL_MINT = "So11111111111111111111111111111111111111112"  # wrapped SOL, ключ цены нативного SOL 
\ No newline at end of file
@@ -1,24 +1,37 @@
-from typing import List
-from services.solscan.models import SolscanAPI
-from services.solscan.solscan_engine import SolscanEngine
+from typing import List, Optional
+from services.solscan.models import SolscanAPI, TokenHolder
+from services.solscan.solscan_engine import HolderPagesError, SolscanEngine
 from services.twitter.twitter_engine import TwitterEngine
-from utils import regexp_check_sol
+from utils.eligibility import eligibility_engine, not_eligible_result
+from utils.owner_cache import OwnerResultCache
+from utils.balance_stage import BalanceStage
+from utils.progress import PipelineMetrics, ProgressRenderer
+from utils.result_sink import MemorySink, ResultSink
+from utils.run_journal import RunJournal, resumable_pages
 from utils.proxy_manager import ProxyManager
-from utils.csv_writer import CSVWriter
+from utils.csv_writer import CSVWriter, StreamingCSVSink
+from utils.parquet_writer import ParquetSink
+from utils.http_client import http_pool
+from utils.headers_manager import default_headers_manager
+from utils.prices import price_service
+from utils import json_backend
 import os
-from concurrent.futures import ThreadPoolExecutor
-from threading import Lock
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Condition
+from queue import Queue
 import math
 from utils.logger import logger
 import logging
 import logging.config
 from config.config import LOGGING_CONFIG
-from rich import print as rprint
-from rich.console import Console
-from rich.panel import Panel
 from utils.wallets import BalanceChecker
 import sys
-from config.constants import CHUNK_SIZE
+import argparse
+import asyncio
+from config.constants import (
+    CHUNK_SIZE, HOLDER_QUEUE_SIZE, TWITTER_WORKERS_PER_CHUNK, OWNER_CACHE_FILE, BALANCE_MAX_WORKERS,
+    RUN_JOURNAL_FILE
+)
 
 # Инициализация логирования
 logging.config.dictConfig({
@@ -69,7 +82,6 @@ logging.config.dictConfig({
 })
 
 logger = logging.getLogger('twitter_parser')
-console = Console()
 
 def load_contract_addresses(file_path: str) -> list:
     if not os.path.exists(file_path):
@@ -79,108 +91,191 @@ def load_contract_addresses(file_path: str) -> list:
         addresses = [line.strip() for line in file if line.strip()]
     return addresses
 
+# Маркер завершения для Twitter-воркеров
+_QUEUE_DONE = object()
+
+class PendingResults:
+    """Счётчик холдеров чанка, чей вердикт ещё не записан"""
+
+    def __init__(self):
+        self._condition = Condition()
+        self._count = 0
+
+    def add(self) -> None:
+        with self._condition:
+            self._count += 1
+
+    def done(self) -> None:
+        with self._condition:
+            self._count -= 1
+            if not self._count:
+                self._condition.notify_all()
+
+    def wait(self) -> None:
+        with self._condition:
+            self._condition.wait_for(lambda: not self._count)
+
 def split_into_chunks(lst: list, chunk_size: int) -> list:
     return [lst[i:i + chunk_size] for i in range(0, len(lst), chunk_size)]
 
-def process_contract_chunk(contract_addresses: list, proxy_manager: ProxyManager, 
-                         eligible_holders: list, not_eligible_holders: list, lock: Lock):
+def start_owner_search(owner: str, twitter_engine: TwitterEngine, balance_stage: BalanceStage,
+                       owner_cache: OwnerResultCache) -> None:
+    """Поиск твитов владельца; найденные передаются в стадию баланса без ожидания"""
+    try:
+        search_response = twitter_engine.get_latest_posts(query=owner)
+        verdict = eligibility_engine.evaluate(owner, search_response)
+        if verdict.entry is None:
+            owner_cache.resolve(owner, not_eligible_result(owner, verdict))
+            return
+        owner_cache.chain(owner, balance_stage.submit(owner, verdict.entry))
+    except Exception as e:
+        owner_cache.fail(owner, e)
+
+def record_result(holder: TokenHolder, future: Future, sink: ResultSink, metrics: PipelineMetrics,
+                  pending: 'PendingResults') -> None:
+    """Колбэк готового вердикта: строка сразу уходит в приёмник результатов"""
+    try:
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Ошибка при обработке холдера {holder.owner}: {str(error)}", exc_info=error)
+            return
+        result = future.result()
+    
+        sink.add(result)
+
+        # Счётчики пишутся в шард текущего потока, вывод — забота ProgressRenderer
+        metrics.add('processed_holders')
+        metrics.add('eligible' if result.eligible else 'not_eligible')
+    finally:
+        pending.done()
+
+def check_holder(holder: TokenHolder, twitter_engine: TwitterEngine, balance_stage: BalanceStage,
+                 owner_cache: OwnerResultCache, sink: ResultSink, metrics: PipelineMetrics,
+                 pending: 'PendingResults'):
+    logger.debug(f"Проверка холдера: {holder.owner}")
+    # Повторяющиеся владельцы (в т.ч. из других чанков) получают один общий Future
+    future, leader = owner_cache.claim(holder.owner)
+    if leader:
+        start_owner_search(holder.owner, twitter_engine, balance_stage, owner_cache)
+    # Счётчик — только вместе с колбэком, который его уменьшит
+    pending.add()
+    future.add_done_callback(
+        lambda done: record_result(holder, done, sink, metrics, pending)
+    )
+
+def twitter_worker(holder_queue: Queue, twitter_engine: TwitterEngine, balance_stage: BalanceStage,
+                   owner_cache: OwnerResultCache, sink: ResultSink, metrics: PipelineMetrics,
+                   pending: 'PendingResults'):
+    """Потребитель очереди холдеров со своим TwitterEngine.
+
+    Ошибка по одному холдеру не останавливает воркер: иначе производитель
+    повис бы на put() в заполненную очередь.
+    """
+    while True:
+        holder = holder_queue.get()
+        if holder is _QUEUE_DONE:
+            break
+        try:
+            check_holder(holder, twitter_engine, balance_stage, owner_cache, sink, metrics, pending)
+        except Exception as e:
+            logger.error(f"Ошибка при проверке холдера {holder.owner}: {str(e)}", exc_info=True)
+
+def process_contract_chunk(contract_addresses: list, proxy_manager: ProxyManager, owner_cache: OwnerResultCache,
+                         balance_stage: BalanceStage, sink: ResultSink, metrics: PipelineMetrics,
+                         journal: Optional[RunJournal] = None):
     logger.info(f"Начало обработки чанка с {len(contract_addresses)} контрактами")
-    twitter_engine = TwitterEngine(proxy_manager=proxy_manager)
     solscan_engine = SolscanEngine(proxy_manager=proxy_manager)
-    balance_checker = BalanceChecker()
+    pending = PendingResults()
     
-    chunk_stats = {
-        'total_contracts': len(contract_addresses),
-        'processed_contracts': 0,
-        'total_holders': 0,
-        'processed_holders': 0,
-        'eligible': 0,
-        'not_eligible': 0
-    }
+    # Страницы Solscan сразу уходят в ограниченную очередь, а Twitter-воркеры
+    # разбирают её параллельно с пагинацией
+    holder_queue = Queue(maxsize=HOLDER_QUEUE_SIZE)
+    # Движки создаются до запуска воркеров: ошибка конфигурации прерывает
+    # чанк, а не убивает потребителей, пока производитель ждёт места в очереди
+    twitter_engines = [TwitterEngine(proxy_manager=proxy_manager) for _ in range(TWITTER_WORKERS_PER_CHUNK)]
     
-    for contract_address in contract_addresses:
+    with ThreadPoolExecutor(max_workers=TWITTER_WORKERS_PER_CHUNK) as workers:
+        for twitter_engine in twitter_engines:
+            workers.submit(
+                twitter_worker, holder_queue, twitter_engine, balance_stage, owner_cache, sink, metrics, pending
+            )
+        
         try:
-            logger.info(f"Обработка контракта: {contract_address}")
-            all_holders = solscan_engine.get_holders(contract_address, 100)
-            
-            if not all_holders or not all_holders.data:
-                logger.warning(f"Не удалось получить холдеров для контракта {contract_address}")
-                continue
-
-            with lock:
-                chunk_stats['processed_contracts'] += 1
-                chunk_stats['total_holders'] += len(all_holders.data)
-                
-                # Вычисляем проценты
-                contracts_progress = (chunk_stats['processed_contracts'] / chunk_stats['total_contracts']) * 100
-                holders_progress = (chunk_stats['processed_holders'] / chunk_stats['total_holders'] * 100) if chunk_stats['total_holders'] > 0 else 0
-                
-                # Обновляем прогресс в одну строку
-                print(f"\r📈 Контракты: {contracts_progress:.1f}% ({chunk_stats['processed_contracts']}/{chunk_stats['total_contracts']}) | "
-                      f"Холдеры: {holders_progress:.1f}% ({chunk_stats['processed_holders']}/{chunk_stats['total_holders']}) | "
-                      f"✅ {chunk_stats['eligible']} | ❌ {chunk_stats['not_eligible']}", end='', flush=True)
-
-            for holder in all_holders.data:
+            for contract_address in contract_addresses:
                 try:
-                    logger.debug(f"Проверка холдера: {holder.owner}")
-                    search_response = twitter_engine.get_latest_posts(query=holder.owner)
-                
-                    with lock:
-                        chunk_stats['processed_holders'] += 1
-                        
-                        if not search_response or not search_response.entries:
-                            chunk_stats['not_eligible'] += 1
-                            not_eligible_holders.append({
-                                'address': holder.owner,
-                                'reason': 'Твиты не найдены'
-                            })
-                        else:
-                            found_eligible_tweet = False
-                            for entry in search_response.entries:
-                                if entry.tweet and regexp_check_sol(entry.tweet.text):
-                                    balances, usd_values = balance_checker.get_wallet_balance(holder.owner)
-                                    total_usd = sum(usd_values.values()) if usd_values else 0
-                                    
-                                    chunk_stats['eligible'] += 1
-                                    eligible_holders.append({
-                                        'address': holder.owner,
-                                        'twitter_username': entry.tweet.author.screen_name,
-                                        'tweet_text': entry.tweet.text,
-                                        'can_dm': entry.tweet.author.can_dm,
-                                        'followers_count': entry.tweet.author.followers_count,
-                                        'total_balance_usd': total_usd,
-                                    })
-                                    print(f"\n✨ Найден: @{entry.tweet.author.screen_name} ({holder.owner[:8]}...) | Баланс: ${total_usd:.2f}")
-                                    found_eligible_tweet = True
-                                    break
+                    logger.info(f"Обработка контракта: {contract_address}")
+                    holders_received = 0
+                    
+                    # При продолжении прогона уже полученные страницы берутся из журнала
+                    pages = resumable_pages(
+                        journal, contract_address,
+                        lambda start_page: solscan_engine.iter_holder_pages(contract_address, 100, start_page)
+                    )
+                    try:
+                        for page in pages:
+                            holders_received += len(page)
+                            metrics.add('total_holders', len(page))
                             
-                            if not found_eligible_tweet:
-                                chunk_stats['not_eligible'] += 1
-                                not_eligible_holders.append({
-                                    'address': holder.owner,
-                                    'reason': 'Нет твитов с упоминанием SOL'
-                                })
-                        
-                        # Обновляем проценты
-                        contracts_progress = (chunk_stats['processed_contracts'] / chunk_stats['total_contracts']) * 100
-                        holders_progress = (chunk_stats['processed_holders'] / chunk_stats['total_holders'] * 100) if chunk_stats['total_holders'] > 0 else 0
-                        
-                        # Обновляем статистику после каждого обработанного холдера
-                        print(f"\r📈 Контракты: {contracts_progress:.1f}% ({chunk_stats['processed_contracts']}/{chunk_stats['total_contracts']}) | "
-                              f"Холдеры: {holders_progress:.1f}% ({chunk_stats['processed_holders']}/{chunk_stats['total_holders']}) | "
-                              f"✅ {chunk_stats['eligible']} | ❌ {chunk_stats['not_eligible']}", end='', flush=True)
+                            for holder in page:
+                                holder_queue.put(holder)
+                    except HolderPagesError as e:
+                        # Контракт не отмечается завершённым: --resume дополучит страницы
+                        logger.error(f"Пагинация прервана, получено {holders_received} холдеров: {str(e)}")
+                        continue
+                    
+                    if not holders_received:
+                        logger.warning(f"Не удалось получить холдеров для контракта {contract_address}")
+                        continue
 
-                except Exception as holder_error:
-                    logger.error(f"Ошибка при обработке холдера {holder.owner}: {str(holder_error)}", exc_info=True)
+                    if journal is not None:
+                        journal.finish_contract(contract_address)
+                    metrics.add('processed_contracts')
 
-        except Exception as e:
-            logger.error(f"Ошибка при обработке контракта {contract_address}: {str(e)}", exc_info=True)
-            print(f"\n❌ Ошибка контракта {contract_address}: {str(e)}")
+                except Exception as e:
+                    logger.error(f"Ошибка при обработке контракта {contract_address}: {str(e)}", exc_info=True)
+        finally:
+            for _ in range(TWITTER_WORKERS_PER_CHUNK):
+                holder_queue.put(_QUEUE_DONE)
 
-    logger.info(f"Завершена обработка чанка. Статистика: {chunk_stats}")
-    return chunk_stats
+    # Вердикты найденных владельцев могут ещё считаться в стадии баланса
+    pending.wait()
+
+    logger.info(f"Завершена обработка чанка из {len(contract_addresses)} контрактов")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Поиск Twitter-аккаунтов холдеров Solana-токенов")
+    parser.add_argument(
+        '--async', dest='use_async', action='store_true',
+        help="Асинхронный режим: один цикл событий вместо пула потоков по чанкам"
+    )
+    parser.add_argument(
+        '--owner-cache', metavar='PATH', default=OWNER_CACHE_FILE,
+        help="JSONL-файл с вердиктами по владельцам; повторный запуск пропускает уже проверенных"
+    )
+    parser.add_argument(
+        '--in-memory', action='store_true',
+        help="Копить результаты в памяти и записать CSV в конце вместо потоковой записи"
+    )
+    parser.add_argument(
+        '--output-format', choices=('csv', 'parquet'), default='csv',
+        help="Формат файлов результатов; parquet требует pyarrow"
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help="Продолжить прерванный прогон по журналу: без повторных запросов страниц и поиска владельцев"
+    )
+    parser.add_argument(
+        '--journal', metavar='PATH', default=RUN_JOURNAL_FILE,
+        help="SQLite-журнал прогона (по умолчанию %(default)s)"
+    )
+    args = parser.parse_args()
+    if args.in_memory and args.output_format != 'csv':
+        parser.error("--in-memory поддерживается только для --output-format csv")
+    return args
 
 def main():
+    args = parse_args()
+    
     try:
         # Установка кодировки для stdout
         if sys.stdout.encoding != 'utf-8':
@@ -189,21 +284,34 @@ def main():
         # Для старых версий Python
         pass
     
+    # rich грузится после разбора аргументов: --help и ошибки CLI не платят за импорт
+    from rich.console import Console
+    from rich.panel import Panel
+    console = Console()
+    
     proxy_manager = ProxyManager()
+    proxy_check = proxy_manager.start_health_checks()
     csv_writer = CSVWriter()
+    journal = RunJournal(args.journal, resume=args.resume)
+    owner_cache = OwnerResultCache(args.owner_cache, journal=journal)
     
     contract_addresses = load_contract_addresses('config/contractAddresses.txt')
     contract_chunks = split_into_chunks(contract_addresses, CHUNK_SIZE)
     
-    eligible_holders = []
-    not_eligible_holders = []
-    lock = Lock()
+    # По умолчанию строки пишутся на диск по мере появления и не копятся в памяти
+    if args.output_format == 'parquet':
+        sink = ParquetSink()
+    else:
+        sink = MemorySink() if args.in_memory else StreamingCSVSink()
     
     console.print(Panel.fit(
         "[bold green]🚀 Twitter Parser Started[/bold green]\n\n"
         f"[cyan]Контрактов:[/cyan] {len(contract_addresses)}\n"
         f"[cyan]Размер чанка:[/cyan] {CHUNK_SIZE}\n"
-        f"[cyan]Всего чанков:[/cyan] {len(contract_chunks)}",
+        f"[cyan]Всего чанков:[/cyan] {len(contract_chunks)}\n"
+        f"[cyan]Рабочих прокси:[/cyan] {sum(proxy_check.values())}/{len(proxy_check)}\n"
+        f"[cyan]Режим:[/cyan] {'asyncio' if args.use_async else 'потоки'}"
+        f"{' (продолжение)' if args.resume else ''}",
         title="🤖 Twitter Parser",
         border_style="green"
     ))
@@ -214,17 +322,24 @@ def main():
         """Функция для сохранения промежуточных результатов"""
         try:
             logger.info("Сохранение промежуточных результатов...")
-            eligible_file = csv_writer.write_eligible_holders(eligible_holders)
-            not_eligible_file = csv_writer.write_not_eligible_holders(not_eligible_holders)
+            if isinstance(sink, MemorySink):
+                eligible_files = [csv_writer.write_eligible_holders(sink.eligible_holders)]
+                not_eligible_files = [csv_writer.write_not_eligible_holders(sink.not_eligible_holders)]
+            else:
+                # Повторный вызов безопасен: close() идемпотентен
+                sink.close()
+                files = sink.files()
+                eligible_files, not_eligible_files = files['eligible'], files['not_eligible']
             
-            eligible_path = os.path.relpath(eligible_file) if eligible_file else "Не создан"
-            not_eligible_path = os.path.relpath(not_eligible_file) if not_eligible_file else "Не создан"
+            eligible_path = ', '.join(os.path.relpath(f) for f in eligible_files if f) or "Не создан"
+            not_eligible_path = ', '.join(os.path.relpath(f) for f in not_eligible_files if f) or "Не создан"
+            stats = metrics.snapshot()
             
             console.print(Panel(
                 "[bold yellow]⚠️ Программа прервана пользователем[/bold yellow]\n\n"
                 "[green]📊 Промежуточные результаты:[/green]\n"
-                f"✓ Подходящих холдеров: {len(eligible_holders)}\n"
-                f"✓ Неподходящих холдеров: {len(not_eligible_holders)}\n\n"
+                f"✓ Подходящих холдеров: {stats['eligible']}\n"
+                f"✓ Неподходящих холдеров: {stats['not_eligible']}\n\n"
                 f"[blue]📂 Файлы сохранены:[/blue]\n"
                 f"✓ Подходящие: {eligible_path}\n"
                 f"✓ Неподходящие: {not_eligible_path}",
@@ -240,62 +355,66 @@ def main():
                 border_style="red"
             ))
     
+    metrics = PipelineMetrics(total_contracts=len(contract_addresses))
+    
     try:
-        with ThreadPoolExecutor(max_workers=len(contract_chunks)) as executor:
-            futures = [
-                executor.submit(
-                    process_contract_chunk, 
-                    chunk, 
-                    proxy_manager,
-                    eligible_holders,
-                    not_eligible_holders,
-                    lock
-                ) for chunk in contract_chunks
-            ]
-            
-            # Собираем общую статистику
-            total_stats = {
-                'total_contracts': len(contract_addresses),
-                'processed_contracts': 0,
-                'total_holders': 0,
-                'processed_holders': 0,
-                'eligible': len(eligible_holders),
-                'not_eligible': len(not_eligible_holders)
-            }
-            
-            try:
-                for future in futures:
-                    chunk_stats = future.result()
-                    if chunk_stats:
-                        total_stats['processed_contracts'] += chunk_stats['processed_contracts']
-                        total_stats['total_holders'] += chunk_stats['total_holders']
-                        total_stats['processed_holders'] += chunk_stats['processed_holders']
-            except KeyboardInterrupt:
-                logger.warning("Получен сигнал прерывания (CTRL+C)")
-                executor.shutdown(wait=False)
-                save_results()
-                sys.exit(1)
+        with ProgressRenderer(metrics, console=console):
+            if args.use_async:
+                from async_main import run_pipeline
+                asyncio.run(run_pipeline(
+                    contract_addresses, proxy_manager, owner_cache, sink, metrics, journal
+                ))
+            else:
+                balance_stage = BalanceStage(BalanceChecker(), BALANCE_MAX_WORKERS)
+                with balance_stage, ThreadPoolExecutor(max_workers=len(contract_chunks)) as executor:
+                    futures = [
+                        executor.submit(
+                            process_contract_chunk, 
+                            chunk, 
+                            proxy_manager,
+                            owner_cache,
+                            balance_stage,
+                            sink,
+                            metrics,
+                            journal
+                        ) for chunk in contract_chunks
+                    ]
+                
+                    try:
+                        for future in futures:
+                            future.result()
+                    except KeyboardInterrupt:
+                        logger.warning("Получен сигнал прерывания (CTRL+C)")
+                        executor.shutdown(wait=False)
+                        balance_stage.shutdown(wait=False)
+                        save_results()
+                        sys.exit(1)
 
-        print("\n")
-        
         # Сохраняем финальные результаты
         save_results()
         
-        contracts_progress = (total_stats['processed_contracts'] / total_stats['total_contracts'] * 100) if total_stats['total_contracts'] > 0 else 0
-        holders_progress = (total_stats['processed_holders'] / total_stats['total_holders'] * 100) if total_stats['total_holders'] > 0 else 0
+        total_stats = metrics.snapshot()
 
         console.print(Panel(
             "[bold green]✨ Обработка успешно завершена![/bold green]\n\n"
             f"[green]📊 Итоговая статистика:[/green]\n"
-            f"✓ Контракты: {contracts_progress:.1f}% ({total_stats['processed_contracts']}/{total_stats['total_contracts']})\n"
-            f"✓ Холдеры: {holders_progress:.1f}% ({total_stats['processed_holders']}/{total_stats['total_holders']})\n"
-            f"✓ Подходящих: {len(eligible_holders)}\n"
-            f"✓ Неподходящих: {len(not_eligible_holders)}",
+            f"✓ Контракты: {total_stats['contracts_percent']:.1f}% ({total_stats['processed_contracts']}/{total_stats['total_contracts']})\n"
+            f"✓ Холдеры: {total_stats['holders_percent']:.1f}% ({total_stats['processed_holders']}/{total_stats['total_holders']})\n"
+            f"✓ Подходящих: {total_stats['eligible']}\n"
+            f"✓ Неподходящих: {total_stats['not_eligible']}\n"
+            f"✓ Скорость: {total_stats['holders_per_sec']:.1f} холдеров/с",
             title="📈 Результаты",
             border_style="green"
         ))
         
-        logger.info(f"Processing completed. Eligible: {len(eligible_holders)}, Not eligible: {len(not_eligible_holders)}")
+        logger.info(f"Processing completed. Eligible: {total_stats['eligible']}, Not eligible: {total_stats['not_eligible']}")
+        logger.info(f"Pipeline stats: {total_stats}")
+        logger.info(f"HTTP pool stats: {http_pool.stats()}")
+        logger.info(f"Owner cache stats: {owner_cache.stats()}")
+        logger.info(f"Run journal stats: {journal.stats()}")
+        logger.info(f"Twitter accounts stats: {default_headers_manager().stats()}")
+        logger.info(f"Price service stats: {price_service.stats()}")
+        json_backend.log_decode_stats()
         
     except KeyboardInterrupt:
         logger.warning("Получен сигнал прерывания (CTRL+C)")
@@ -0,0 +1,91 @@
+import logging
+from typing import AsyncIterator, List, Optional
+
+from config.constants import SOLSCAN_PAGE_SIZE, SOLSCAN_MAX_PAGE, MAX_RETRIES
+from services.solscan.models import SolscanAPI, TokenHolder
+from services.solscan.solscan_engine import HolderPagesError, SolscanEngine
+from utils.async_http import AsyncHttpClient, ASYNC_REQUEST_ERRORS
+from utils.proxy_manager import ProxyManager
+
+logger = logging.getLogger('twitter_parser')
+
+
+class AsyncSolscanEngine(SolscanEngine):
+    """Асинхронный вариант SolscanEngine поверх общего AsyncHttpClient"""
+
+    def __init__(self, http_client: AsyncHttpClient, proxy_manager: Optional[ProxyManager] = None):
+        super().__init__(proxy_manager=proxy_manager)
+        self.http_client = http_client
+
+    async def iter_holder_pages(self, contract_address: str, page_size: int = SOLSCAN_PAGE_SIZE,
+                                start_page: int = 1) -> AsyncIterator[List[TokenHolder]]:
+        """Асинхронная постраничная выдача холдеров; при сбое пагинации — HolderPagesError"""
+        logger.info(f"Начало получения холдеров для контракта {contract_address}")
+        current_page = start_page
+        total_holders_processed = 0
+
+        while current_page < SOLSCAN_MAX_PAGE:
+            url = self.construct_search_url(contract_address, page_size, current_page)
+            logger.debug(f"Запрос к Solscan API: {url}")
+            page_data = None
+
+            for attempt in range(MAX_RETRIES):
+                proxy_url = self.proxy_manager.get_proxy()
+                if not proxy_url:
+                    logger.error("Не удалось получить прокси для запроса")
+                    raise HolderPagesError(contract_address, current_page, "нет прокси для запроса")
+
+                try:
+                    response = await self.http_client.get(url, headers=self.headers, proxy=proxy_url)
+                    response.raise_for_status()
+                    self.proxy_manager.report_success(proxy_url, response.elapsed)
+
+                    if not response.content.strip():
+                        logger.warning(f"Получен пустой ответ от Solscan API для контракта {contract_address}")
+                        raise HolderPagesError(contract_address, current_page, "пустой ответ Solscan API")
+
+                    try:
+                        page_response = self._parse_page(response.content)
+                    except ValueError as json_error:
+                        logger.error(f"Ошибка парсинга JSON: {str(json_error)}", exc_info=True)
+                        if attempt == MAX_RETRIES - 1:
+                            raise HolderPagesError(contract_address, current_page, "не удалось разобрать ответ")
+                        continue
+
+                    if not page_response.data:
+                        logger.info(f"Контракт {contract_address}: обработано {total_holders_processed} холдеров")
+                        return
+
+                    page_data = page_response.data
+                    break
+
+                except ASYNC_REQUEST_ERRORS as e:
+                    logger.error(f"Ошибка запроса к Solscan API: {str(e)}", exc_info=True)
+                    self.proxy_manager.report_error(proxy_url)
+                    if attempt == MAX_RETRIES - 1:
+                        logger.error(f"Превышено максимальное количество попыток запроса для контракта {contract_address}")
+                        raise HolderPagesError(contract_address, current_page, "превышено число попыток запроса")
+                except HolderPagesError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Неожиданная ошибка при получении холдеров: {str(e)}", exc_info=True)
+                    raise HolderPagesError(contract_address, current_page, f"неожиданная ошибка: {str(e)}") from e
+
+            if page_data is None:
+                raise HolderPagesError(contract_address, current_page, "страница не получена")
+
+            total_holders_processed += len(page_data)
+            yield page_data
+            current_page += 1
+
+        logger.info(f"Завершено получение холдеров для контракта {contract_address}. Всего получено: {total_holders_processed}")
+
+    async def get_holders(self, contract_address: str, page_size: int = SOLSCAN_PAGE_SIZE) -> SolscanAPI:
+        all_holders_data = []
+        try:
+            async for page in self.iter_holder_pages(contract_address, page_size):
+                all_holders_data.extend(page)
+        except HolderPagesError as e:
+            logger.error(f"Холдеры получены не полностью: {str(e)}")
+            return SolscanAPI(success=False, data=all_holders_data, metadata={})
+        return SolscanAPI(success=True, data=all_holders_data, metadata={})
@@ -3,6 +3,8 @@ from typing import List, Dict, Optional, Any
 
 @dataclass
 class TokenHolder:
+    # Слоты вручную ради Python 3.8: холдеров в памяти одновременно тысячи
+    __slots__ = ('address', 'amount', 'decimals', 'owner', 'rank', 'withheldAmount')
     address: str
     amount: int
     decimals: int
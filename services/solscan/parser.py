@@ -0,0 +1,116 @@
+"""Разбор страницы холдеров Solscan без построения полного дерева dataclass.
+
+Конвейеру нужен только data[] (owner каждого холдера), поэтому холдеры
+собираются сразу в компактные TokenHolder, а блок metadata хранится в
+сыром виде и превращается в Metadata только при обращении к нему.
+"""
+import time
+from typing import Any, List, Optional, Union
+
+from services.solscan.models import Metadata, SolscanAPI, TokenHolder
+from utils import json_backend
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+ENDPOINT = 'solscan.holders'
+
+
+class LazyMetadata:
+    """Блок metadata, который декодируется при первом обращении"""
+
+    __slots__ = ('_raw', '_dict', '_value')
+
+    def __init__(self, raw: Union[bytes, dict, None]):
+        self._raw = raw
+        self._dict: Optional[dict] = raw if isinstance(raw, dict) else None
+        self._value: Optional[Metadata] = None
+
+    def as_dict(self) -> dict:
+        if self._dict is None:
+            self._dict = json_backend.loads(self._raw) if self._raw else {}
+            if not isinstance(self._dict, dict):
+                self._dict = {}
+        return self._dict
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.as_dict().get(key, default)
+
+    @property
+    def value(self) -> Metadata:
+        """Полный Metadata с вложенными TokenInfo и т.д."""
+        if self._value is None:
+            from dacite import from_dict, Config
+            from typing import Dict, List
+            config = Config(
+                check_types=False,
+                cast=[int, float],
+                type_hooks={
+                    Dict: lambda x: x if x is not None else {},
+                    List: lambda x: x if x is not None else [],
+                }
+            )
+            self._value = from_dict(data_class=Metadata, data=self.as_dict(), config=config)
+        return self._value
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.value, name)
+
+
+def _holders_from_dicts(rows: Optional[list]) -> List[TokenHolder]:
+    holders = []
+    append = holders.append
+    for row in rows or ():
+        append(TokenHolder(
+            row['address'],
+            int(row['amount']),
+            int(row['decimals']),
+            row['owner'],
+            int(row['rank']),
+            int(row.get('withheldAmount') or 0)
+        ))
+    return holders
+
+
+def _parse_generic(content: bytes) -> SolscanAPI:
+    data = json_backend.loads(content, ENDPOINT)
+    return SolscanAPI(
+        success=data.get('success', True),
+        data=_holders_from_dicts(data.get('data')),
+        metadata=LazyMetadata(data.get('metadata')),
+        total=data.get('total')
+    )
+
+
+if msgspec is not None:
+    class _HolderPage(msgspec.Struct):
+        data: Optional[List[TokenHolder]] = None
+        metadata: msgspec.Raw = msgspec.Raw(b'')
+        success: bool = True
+        total: Optional[int] = None
+
+    _page_decoder = msgspec.json.Decoder(_HolderPage)
+
+    def parse_holders_page(content: bytes) -> SolscanAPI:
+        """Страница холдеров из сырых байтов ответа"""
+        started = time.perf_counter()
+        try:
+            page = _page_decoder.decode(content)
+        except msgspec.ValidationError:
+            # Нестандартные типы (строковые суммы, пропущенные поля) — общий путь
+            return _parse_generic(content)
+        json_backend.record_decode(ENDPOINT, len(content), time.perf_counter() - started)
+        return SolscanAPI(
+            success=page.success,
+            data=page.data or [],
+            metadata=LazyMetadata(bytes(page.metadata)),
+            total=page.total
+        )
+else:
+    def parse_holders_page(content: bytes) -> SolscanAPI:
+        """Страница холдеров из сырых байтов ответа"""
+        return _parse_generic(content)
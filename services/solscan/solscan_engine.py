@@ -1,17 +1,16 @@
 import os
 import sys
-from typing import Dict, List, Optional
+from typing import Iterator, List, Optional
 import requests
-from dacite import from_dict, Config
-import time
 from utils.proxy_manager import ProxyManager
+from utils.http_client import http_pool
 import logging
 
 from config import SOLSCAN_BASE_HEADER
-from services.solscan.models import SolscanAPI
+from services.solscan.models import SolscanAPI, TokenHolder
+from services.solscan.parser import parse_holders_page
 from config.constants import (
-    SOLSCAN_PAGE_SIZE, SOLSCAN_MAX_PAGE, MAX_RETRIES,
-    SOLSCAN_DELAY_BETWEEN_REQUESTS, REQUEST_TIMEOUT
+    SOLSCAN_PAGE_SIZE, SOLSCAN_MAX_PAGE, MAX_RETRIES, REQUEST_TIMEOUT
 )
 
 # Добавляем корневую директорию проекта в PYTHONPATH
@@ -19,94 +18,86 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 logger = logging.getLogger('twitter_parser')
 
+
+class HolderPagesError(Exception):
+    """Пагинация холдеров прервана до последней страницы: контракт получен не полностью"""
+
+    def __init__(self, contract_address: str, page: int, reason: str):
+        super().__init__(f"{reason} (контракт {contract_address}, страница {page})")
+        self.contract_address = contract_address
+        self.page = page
+
+
 class SolscanEngine:
     def __init__(self, proxy_manager: Optional[ProxyManager] = None):
         self.headers = SOLSCAN_BASE_HEADER
         self.proxy_manager = proxy_manager or ProxyManager()
-        self.config = Config(
-            check_types=False,
-            cast=[int, float],
-            type_hooks={
-                Dict: lambda x: x if x is not None else {},
-                List: lambda x: x if x is not None else [],
-            }
-        )
 
     @staticmethod
     def construct_search_url(contract_address: str, page_size: int = SOLSCAN_PAGE_SIZE, page: int = 1) -> str:
         return f"https://api-v2.solscan.io/v2/token/holders?address={contract_address}&page_size={page_size}&page={page}"
 
-    def get_holders(self, contract_address: str, page_size: int = SOLSCAN_PAGE_SIZE) -> SolscanAPI:
+    def _parse_page(self, content: bytes) -> SolscanAPI:
+        """Десериализация одной страницы холдеров (metadata — лениво)"""
+        return parse_holders_page(content)
+
+    def iter_holder_pages(self, contract_address: str, page_size: int = SOLSCAN_PAGE_SIZE,
+                          start_page: int = 1) -> Iterator[List[TokenHolder]]:
+        """Постраничная выдача холдеров по мере получения ответов Solscan.
+
+        Заканчивается на пустой странице или SOLSCAN_MAX_PAGE; если очередную
+        страницу получить не удалось, поднимает HolderPagesError.
+        """
         logger.info(f"Начало получения холдеров для контракта {contract_address}")
-        all_holders_data = []
-        current_page = 1
+        current_page = start_page
         retry_limit = MAX_RETRIES  # Создаем локальную переменную
-        delay = SOLSCAN_DELAY_BETWEEN_REQUESTS
         
-        metadata = None
         total_holders_processed = 0
         total_expected = None
 
-        print(f"\r📊 Контракт {contract_address}: ", end='', flush=True)
-
         while current_page < SOLSCAN_MAX_PAGE:
             url = self.construct_search_url(contract_address, page_size, current_page)
             logger.debug(f"Запрос к Solscan API: {url}")
+            page_data = None
             
             for attempt in range(retry_limit):
                 proxy_url = self.proxy_manager.get_proxy()
                 if not proxy_url:
                     logger.error("Не удалось получить прокси для запроса")
-                    return SolscanAPI(success=True, data=all_holders_data, metadata=metadata or {})
+                    raise HolderPagesError(contract_address, current_page, "нет прокси для запроса")
 
                 try:
-                    response = requests.get(
+                    response = http_pool.get(
                         url, 
+                        proxy=proxy_url,
                         headers=self.headers, 
-                        proxies={'http': proxy_url, 'https': proxy_url},
                         timeout=REQUEST_TIMEOUT
                     )
                     response.raise_for_status()
+                    self.proxy_manager.report_success(proxy_url, response.elapsed.total_seconds())
                     
-                    if not response.text.strip():
+                    if not response.content.strip():
                         logger.warning(f"Получен пустой ответ от Solscan API для контракта {contract_address}")
-                        return SolscanAPI(success=True, data=all_holders_data, metadata=metadata or {})
+                        raise HolderPagesError(contract_address, current_page, "пустой ответ Solscan API")
                     
                     try:
-                        response_data = response.json()
-                        page_response = from_dict(
-                            data_class=SolscanAPI,
-                            data=response_data,
-                            config=self.config
-                        )
+                        page_response = self._parse_page(response.content)
                         
-                        if total_expected is None and 'total' in response_data.get('metadata', {}):
-                            total_expected = response_data['metadata']['total']
+                        if total_expected is None:
+                            total_expected = page_response.metadata.get('total')
                         
                     except (ValueError, requests.exceptions.JSONDecodeError) as json_error:
                         logger.error(f"Ошибка парсинга JSON: {str(json_error)}", exc_info=True)
                         if attempt == retry_limit - 1:
                             logger.error(f"Превышено максимальное количество попыток парсинга JSON для контракта {contract_address}")
-                            return SolscanAPI(success=True, data=all_holders_data, metadata=metadata or {})
-                        time.sleep(delay)
+                            raise HolderPagesError(contract_address, current_page, "не удалось разобрать ответ")
                         continue
                     
                     if not page_response.data:
-                        print(f"\r💼 Контракт {contract_address}: Обработано {total_holders_processed} холдеров")
-                        return SolscanAPI(success=True, data=all_holders_data, metadata=metadata or {})
-                    
-                    all_holders_data.extend(page_response.data)
-                    total_holders_processed += len(page_response.data)
+                        logger.info(f"Контракт {contract_address}: обработано {total_holders_processed} холдеров")
+                        return
                     
-                    # Вычисляем и отображаем процент выполнения
-                    if total_expected:
-                        progress = (total_holders_processed / total_expected * 100)
-                        print(f"\r📊 Контракт {contract_address}: {progress:.1f}% ({total_holders_processed}/{total_expected})", end='', flush=True)
-                    else:
-                        print(f"\r📊 Контракт {contract_address}: Обработано {total_holders_processed} холдеров", end='', flush=True)
-                    
-                    current_page += 1
-                    time.sleep(delay)
+                    page_data = page_response.data
                     break
                     
                 except requests.exceptions.RequestException as e:
@@ -114,12 +105,40 @@ class SolscanEngine:
                     self.proxy_manager.report_error(proxy_url)
                     if attempt == retry_limit - 1:
                         logger.error(f"Превышено максимальное количество попыток запроса для контракта {contract_address}")
-                        return SolscanAPI(success=True, data=all_holders_data, metadata=metadata or {})
-                    time.sleep(delay)
+                        raise HolderPagesError(contract_address, current_page, "превышено число попыток запроса")
                     continue
+                except HolderPagesError:
+                    raise
                 except Exception as e:
                     logger.error(f"Неожиданная ошибка при получении холдеров: {str(e)}", exc_info=True)
-                    return SolscanAPI(success=True, data=all_holders_data, metadata=metadata or {})
+                    raise HolderPagesError(contract_address, current_page, f"неожиданная ошибка: {str(e)}") from e
+
+            if page_data is None:
+                raise HolderPagesError(contract_address, current_page, "страница не получена")
+
+            total_holders_processed += len(page_data)
+            
+            # Общий прогресс показывает ProgressRenderer, здесь — только журнал
+            if total_expected:
+                progress = (total_holders_processed / total_expected * 100)
+                logger.debug(f"Контракт {contract_address}: {progress:.1f}% ({total_holders_processed}/{total_expected})")
+            else:
+                logger.debug(f"Контракт {contract_address}: обработано {total_holders_processed} холдеров")
+            
+            # Отдаём страницу потребителю до запроса следующей
+            yield page_data
+            
+            # Темп запросов задаёт общий rate limiter в http_pool
+            current_page += 1
 
         logger.info(f"Завершено получение холдеров для контракта {contract_address}. Всего получено: {total_holders_processed}")
-        return SolscanAPI(success=True, data=all_holders_data, metadata=metadata or {})
\ No newline at end of file
+
+    def get_holders(self, contract_address: str, page_size: int = SOLSCAN_PAGE_SIZE) -> SolscanAPI:
+        all_holders_data = []
+        try:
+            for page in self.iter_holder_pages(contract_address, page_size):
+                all_holders_data.extend(page)
+        except HolderPagesError as e:
+            logger.error(f"Холдеры получены не полностью: {str(e)}")
+            return SolscanAPI(success=False, data=all_holders_data, metadata={})
+        return SolscanAPI(success=True, data=all_holders_data, metadata={})
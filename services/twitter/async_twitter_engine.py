@@ -0,0 +1,64 @@
+import logging
+from typing import Optional
+
+from services.twitter.models import TwitterSearchResponse
+from services.twitter.twitter_engine import RETRY_STATUSES, TwitterEngine, TwitterUnavailableError
+from utils.async_http import AsyncHttpClient, ASYNC_REQUEST_ERRORS
+from utils.proxy_manager import ProxyManager
+
+logger = logging.getLogger('twitter_parser')
+
+
+class AsyncTwitterEngine(TwitterEngine):
+    """Асинхронный вариант TwitterEngine: тот же разбор, запросы через aiohttp"""
+
+    def __init__(self, http_client: AsyncHttpClient, proxy_manager: Optional[ProxyManager] = None):
+        super().__init__(proxy_manager=proxy_manager)
+        self.http_client = http_client
+
+    async def get_latest_posts(self, query: str) -> TwitterSearchResponse:
+        # Счётчик попыток локальный: один движок обслуживает много корутин
+        for attempt in range(self.max_retries + 1):
+            proxy_url = self.proxy_manager.get_proxy()
+            credential = await self.headers_manager.acquire_async() if proxy_url else None
+
+            if not proxy_url or not credential:
+                raise TwitterUnavailableError(
+                    f"Не удалось получить прокси или заголовки для запроса. Proxy: {proxy_url}, Headers present: {bool(credential)}"
+                )
+
+            account, headers = credential
+            response = None
+            try:
+                logger.debug(f"Отправка запроса к Twitter API для query: {query}")
+                response = await self.http_client.get(
+                    self.construct_search_url(query),
+                    headers=headers,
+                    proxy=proxy_url
+                )
+
+                self.proxy_manager.report_success(proxy_url, response.elapsed)
+                if response.status_code in RETRY_STATUSES:
+                    # Аккаунт учитывается в headers_manager, повтор — с другим
+                    logger.warning(f"Ответ Twitter {response.status_code}, аккаунт #{account}. Попытка: {attempt + 1}/{self.max_retries + 1}")
+                    continue
+                if response.status_code >= 400:
+                    raise TwitterUnavailableError(f"Ответ Twitter {response.status_code} для query: {query}")
+
+                return self.parse_search_response(response.json('twitter.search'), query)
+
+            except ASYNC_REQUEST_ERRORS as error:
+                logger.warning(f"Ошибка запроса к Twitter API через {proxy_url}: {str(error)}")
+                self.proxy_manager.report_error(proxy_url)
+                continue
+            except TwitterUnavailableError:
+                raise
+            except Exception as e:
+                raise TwitterUnavailableError(f"Неожиданная ошибка при получении твитов: {str(e)}") from e
+            finally:
+                if response is None:
+                    self.headers_manager.report_error(account)
+                else:
+                    self.headers_manager.report_response(account, response.status_code, response.headers)
+
+        raise TwitterUnavailableError(f"Превышено максимальное количество попыток для query: {query}")
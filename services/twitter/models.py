@@ -1,8 +1,13 @@
 from dataclasses import dataclass
 from typing import List, Optional
 
+# __slots__ объявлены вручную (а не slots=True) ради совместимости с Python 3.8:
+# объектов создаются сотни тысяч, и без __dict__ они заметно компактнее
+
 @dataclass
 class User:
+    __slots__ = ('id', 'rest_id', 'name', 'screen_name', 'description',
+                 'followers_count', 'following_count', 'can_dm')
     id: str
     rest_id: str
     name: str
@@ -14,6 +19,8 @@ class User:
     
 @dataclass 
 class Tweet:
+    __slots__ = ('id', 'text', 'created_at', 'author', 'reply_count',
+                 'retweet_count', 'like_count', 'quote_count')
     id: str
     text: str
     created_at: str
@@ -25,9 +32,10 @@ class Tweet:
     
 @dataclass
 class TimelineEntry:
+    __slots__ = ('entry_id', 'tweet')
     entry_id: str
     tweet: Tweet
     
 @dataclass
 class TwitterSearchResponse:
-    entries: List[TimelineEntry]
\ No newline at end of file
+    entries: List[TimelineEntry]
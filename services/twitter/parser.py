@@ -0,0 +1,90 @@
+"""Разбор ответа SearchTimeline без промежуточных словарей и dacite.
+
+Объекты User/Tweet/TimelineEntry создаются напрямую из JSON позиционными
+аргументами — порядок соответствует полям в services.twitter.models.
+"""
+import logging
+from typing import List, Optional
+
+from services.twitter.models import User, Tweet, TimelineEntry
+
+logger = logging.getLogger('twitter_parser')
+
+_EMPTY: dict = {}
+
+
+def parse_user(tweet_data: dict) -> User:
+    """Автор твита; при неполном core — запасной разбор как раньше"""
+    try:
+        user_data = tweet_data['core']['user_results']['result']
+        legacy = user_data['legacy']
+        return User(
+            user_data['id'],
+            user_data['rest_id'],
+            legacy['name'],
+            legacy['screen_name'],
+            legacy['description'],
+            int(legacy['followers_count']),
+            int(legacy['friends_count']),
+            legacy.get('can_dm', False)
+        )
+    except KeyError:
+        user_result = tweet_data.get('user_results', _EMPTY).get('result', _EMPTY)
+        legacy = user_result.get('legacy', _EMPTY)
+        return User(
+            user_result.get('id', ''),
+            user_result.get('rest_id', ''),
+            legacy.get('name', ''),
+            legacy.get('screen_name', ''),
+            legacy.get('description', ''),
+            int(legacy.get('followers_count', 0)),
+            int(legacy.get('friends_count', 0)),
+            legacy.get('can_dm', False)
+        )
+
+
+def parse_tweet(tweet_data: dict) -> Optional[Tweet]:
+    """Твит из tweet_results.result (в т.ч. TweetWithVisibilityResults)"""
+    try:
+        author = parse_user(tweet_data)
+        if 'tweet' in tweet_data:
+            tweet_data = tweet_data['tweet']
+
+        legacy = tweet_data.get('legacy', _EMPTY)
+        return Tweet(
+            tweet_data.get('rest_id', ''),
+            legacy.get('full_text', ''),
+            legacy.get('created_at', ''),
+            author,
+            int(legacy.get('reply_count', 0)),
+            int(legacy.get('retweet_count', 0)),
+            int(legacy.get('favorite_count', 0)),
+            int(legacy.get('quote_count', 0))
+        )
+    except Exception as e:
+        logger.warning(f"Ошибка при парсинге твита: {str(e)}")
+        return None
+
+
+def timeline_entries_data(data: dict) -> list:
+    """Сырые записи первой инструкции ленты"""
+    return data['data']['search_by_raw_query']['search_timeline']['timeline']['instructions'][0]['entries']
+
+
+def parse_entries(entries_data: list) -> List[TimelineEntry]:
+    timeline_entries = []
+    append = timeline_entries.append
+    for entry_data in entries_data:
+        tweet_results = entry_data['content'].get('itemContent', _EMPTY).get('tweet_results')
+        if tweet_results is None:
+            continue
+
+        # Удалённые и недоступные твиты приходят без result
+        tweet_data = tweet_results.get('result')
+        if tweet_data is None:
+            continue
+
+        tweet = parse_tweet(tweet_data)
+        if tweet:
+            append(TimelineEntry(entry_data['entryId'], tweet))
+    return timeline_entries
@@ -0,0 +1,102 @@
+"""ProxyHealthChecker на локальных заглушках прокси: карантин и восстановление"""
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.proxy_health import ProxyHealthChecker
+from utils.proxy_manager import ProxyManager
+
+# Запрос идёт через прокси, поэтому хост не резолвится
+CHECK_URL = 'http://check.invalid/'
+
+
+def make_handler(state: dict):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state['requests'] = state.get('requests', 0) + 1
+            if state.get('drop'):
+                # Прокси принял соединение, но не ответил
+                self.close_connection = True
+                return
+            self.send_response(state.get('status', 200))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def proxy_server():
+    """Заглушка HTTP-прокси: (url, state); state задаёт status или drop"""
+    state = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def dead_proxy():
+    """Адрес, на котором никто не слушает"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def make_manager(tmp_path, proxy_urls):
+    proxies_file = tmp_path / 'proxies.txt'
+    proxies_file.write_text('\n'.join(proxy_urls))
+    manager = ProxyManager(proxies_file=str(proxies_file))
+    manager.health = ProxyHealthChecker(manager, check_url=CHECK_URL, timeout=2)
+    return manager
+
+
+@pytest.mark.parametrize('status', [200, 403, 404, 302])
+def test_any_http_response_means_alive(tmp_path, proxy_server, status):
+    proxy_url, state = proxy_server
+    state['status'] = status
+    manager = make_manager(tmp_path, [proxy_url])
+    try:
+        assert manager.health.probe_all() == {proxy_url: True}
+        assert manager.get_proxy() == proxy_url
+    finally:
+        manager.health.stop()
+
+
+def test_dead_proxy_quarantined(tmp_path, proxy_server, dead_proxy):
+    proxy_url, _ = proxy_server
+    manager = make_manager(tmp_path, [proxy_url, dead_proxy])
+    try:
+        assert manager.health.probe_all() == {proxy_url: True, dead_proxy: False}
+        assert {manager.get_proxy() for _ in range(20)} == {proxy_url}
+        assert manager.health.snapshot()[dead_proxy]['quarantined']
+    finally:
+        manager.health.stop()
+
+
+def test_quarantined_proxy_recovers(tmp_path, proxy_server):
+    proxy_url, state = proxy_server
+    state['drop'] = True
+    manager = make_manager(tmp_path, [proxy_url])
+    try:
+        assert manager.health.probe_all() == {proxy_url: False}
+        assert manager.get_proxy() is None
+
+        state['drop'] = False
+        assert manager.health.probe(proxy_url)[0]
+        assert manager.get_proxy() == proxy_url
+        assert not manager.health.snapshot()[proxy_url]['quarantined']
+    finally:
+        manager.health.stop()
@@ -0,0 +1,32 @@
+"""TokenBucket: очередь ожидания вместо всплеска после блокировки"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.rate_limiter import TokenBucket
+
+
+def test_burst_then_even_spacing():
+    bucket = TokenBucket(5, 10)
+    waits = [bucket.reserve() for _ in range(12)]
+    assert waits[:10] == [0.0] * 10
+    assert waits[10:] == pytest.approx([0.2, 0.4], abs=0.01)
+
+
+def test_no_burst_after_block():
+    bucket = TokenBucket(5, 10)
+    bucket.block_for(2.0)
+    waits = [bucket.reserve() for _ in range(12)]
+    # Первый запрос — по окончании блокировки, остальные — с шагом 1/rate
+    assert waits == pytest.approx([2.0 + 0.2 * i for i in range(12)], abs=0.01)
+
+
+def test_block_keeps_existing_debt():
+    bucket = TokenBucket(5, 1)
+    first, second = bucket.reserve(), bucket.reserve()
+    assert (first, second) == pytest.approx((0.0, 0.2), abs=0.01)
+    bucket.block_for(1.0)
+    assert bucket.reserve() == pytest.approx(1.4, abs=0.01)
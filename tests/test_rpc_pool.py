@@ -0,0 +1,149 @@
+"""RpcEndpointPool на локальных JSON-RPC заглушках: переключение и хеджирование"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.constants import RPC_MAX_ERRORS
+from utils.async_http import AsyncHttpClient
+from utils.http_client import SessionPool
+from utils.rpc_pool import RpcEndpointPool, RpcError
+
+PAYLOAD = {"jsonrpc": "2.0", "id": 7, "method": "getBalance", "params": ["wallet"]}
+SLOW = 0.5
+
+
+def make_handler(value: int, state: dict):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            state['requests'] = state.get('requests', 0) + 1
+            if state.get('down'):
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            time.sleep(state.get('latency', 0.0))
+            data = json.dumps({"jsonrpc": "2.0", "id": request['id'], "result": {"value": value}}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def servers():
+    """Два сервера-заглушки: (url, state), state задаёт latency/down и считает запросы"""
+    running, result = [], []
+    for value in (1, 2):
+        state = {}
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(value, state))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        running.append(server)
+        result.append((f"http://127.0.0.1:{server.server_address[1]}/", state))
+    yield result
+    for server in running:
+        server.shutdown()
+        server.server_close()
+
+
+def make_pool(urls, hedge):
+    pool = RpcEndpointPool(urls, hedge=hedge, session_pool=SessionPool())
+    # Основной — первый: по замерам он быстрее, и дубль уходит через RPC_HEDGE_MIN_DELAY
+    for endpoint, latency in zip(pool.endpoints, (0.01, 0.05)):
+        endpoint.latencies.extend([latency] * 10)
+    return pool
+
+
+def test_failover_from_503(servers):
+    (primary_url, primary_state), (backup_url, _) = servers
+    primary_state['down'] = True
+    pool = make_pool([primary_url, backup_url], hedge=False)
+    primary, backup = pool.endpoints
+
+    assert pool.call(PAYLOAD)['result']['value'] == 2
+    assert (primary.errors, backup.requests) == (1, 1)
+
+    # После RPC_MAX_ERRORS ошибок подряд основной на паузе и запросов не получает
+    for _ in range(RPC_MAX_ERRORS + 2):
+        assert pool.call(PAYLOAD)['result']['value'] == 2
+    assert not primary.available
+    assert pool.ranked()[0] is backup
+    assert primary_state['requests'] == RPC_MAX_ERRORS
+    assert backup.requests == RPC_MAX_ERRORS + 3
+
+
+def test_endpoint_without_samples_gets_probed(servers):
+    (primary_url, _), (backup_url, _) = servers
+    pool = RpcEndpointPool([primary_url, backup_url], hedge=False, session_pool=SessionPool())
+    pool.endpoints[0].latencies.extend([0.01] * 10)
+    # Без замеров эндпоинт идёт первым, а не остаётся на RPC_DEFAULT_LATENCY
+    assert pool.ranked()[0] is pool.endpoints[1]
+    assert pool.call(PAYLOAD)['result']['value'] == 2
+    assert pool.endpoints[1].latencies
+
+
+def test_endpoint_cooldown(servers):
+    (primary_url, primary_state), _ = servers
+    primary_state['down'] = True
+    pool = make_pool([primary_url], hedge=False)
+    for _ in range(RPC_MAX_ERRORS):
+        with pytest.raises(RpcError):
+            pool.call(PAYLOAD)
+    assert not pool.endpoints[0].available
+
+
+def test_all_endpoints_down(servers):
+    for _, state in servers:
+        state['down'] = True
+    pool = make_pool([url for url, _ in servers], hedge=False)
+    with pytest.raises(RpcError):
+        pool.call(PAYLOAD)
+
+
+def test_hedged_request_beats_slow_primary(servers):
+    (primary_url, primary_state), (backup_url, _) = servers
+    primary_state['latency'] = SLOW
+    pool = make_pool([primary_url, backup_url], hedge=True)
+
+    started = time.monotonic()
+    data = pool.call(PAYLOAD)
+    elapsed = time.monotonic() - started
+
+    assert data['result']['value'] == 2
+    assert elapsed < SLOW
+    assert pool.endpoints[1].hedged_wins == 1
+
+
+def test_async_failover_and_hedge(servers):
+    (primary_url, primary_state), (backup_url, _) = servers
+
+    async def run():
+        async with AsyncHttpClient(rate_limiter=None) as http_client:
+            primary_state['down'] = True
+            failover = make_pool([primary_url, backup_url], hedge=False)
+            assert (await failover.call_async(http_client, PAYLOAD))['result']['value'] == 2
+            assert failover.endpoints[0].errors == 1
+
+            primary_state.update(down=False, latency=SLOW)
+            hedged = make_pool([primary_url, backup_url], hedge=True)
+            started = time.monotonic()
+            assert (await hedged.call_async(http_client, PAYLOAD))['result']['value'] == 2
+            assert time.monotonic() - started < SLOW
+            assert hedged.endpoints[1].hedged_wins == 1
+
+    asyncio.run(run())
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import aiohttp
+
+from config.constants import (
+    ASYNC_MAX_CONCURRENCY, REQUEST_TIMEOUT, HTTP_POOL_MAXSIZE, HTTP_KEEPALIVE, HTTP_KEEPALIVE_TIMEOUT
+)
+from utils import json_backend
+from utils.rate_limiter import RateLimiter, rate_limiter as shared_rate_limiter
+
+logger = logging.getLogger('twitter_parser')
+
+
+class HTTPStatusError(Exception):
+    """Ответ с кодом ошибки (аналог requests.HTTPError для asyncio-режима)"""
+
+    def __init__(self, status_code: int, url: str):
+        super().__init__(f"{status_code} Error for url: {url}")
+        self.status_code = status_code
+        self.url = url
+
+
+# Ошибки, после которых запрос имеет смысл повторить через другой прокси
+ASYNC_REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, HTTPStatusError)
+
+
+@dataclass
+class AsyncResponse:
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    elapsed: float = 0.0  # секунды от отправки до получения тела
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self, endpoint: Optional[str] = None):
+        return json_backend.loads(self.content, endpoint)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise HTTPStatusError(self.status_code, self.url)
+
+
+class AsyncHttpClient:
+    """Общая aiohttp-сессия с ограничением числа запросов в полёте"""
+
+    def __init__(self, max_concurrency: int = ASYNC_MAX_CONCURRENCY, timeout: int = REQUEST_TIMEOUT,
+                 rate_limiter: Optional[RateLimiter] = shared_rate_limiter):
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'AsyncHttpClient':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        if self._session is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            # aiohttp сам держит keep-alive пулы по (хост, прокси)
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=HTTP_POOL_MAXSIZE,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT if HTTP_KEEPALIVE else None,
+                force_close=not HTTP_KEEPALIVE
+            )
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=connector,
+                cookie_jar=aiohttp.DummyCookieJar()
+            )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, method: str, url: str, *, headers: Optional[Dict] = None,
+                      proxy: Optional[str] = None, params: Optional[Dict] = None,
+                      json: Optional[dict] = None) -> AsyncResponse:
+        """Выполнение запроса; тело читается целиком до освобождения слота"""
+        await self.open()
+        if self.rate_limiter:
+            # Ждём токен до занятия слота, чтобы не держать его впустую
+            await self.rate_limiter.acquire_async(url, proxy)
+        async with self._semaphore:
+            started = time.monotonic()
+            async with self._session.request(
+                method, url, headers=headers, proxy=proxy, params=params, json=json
+            ) as response:
+                content = await response.read()
+                if self.rate_limiter:
+                    self.rate_limiter.update_from_response(url, proxy, response.status, response.headers)
+                return AsyncResponse(
+                    url=str(response.url),
+                    status_code=response.status,
+                    headers=dict(response.headers),
+                    content=content,
+                    elapsed=time.monotonic() - started
+                )
+
+    async def get(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request('POST', url, **kwargs)
@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Set
+
+logger = logging.getLogger('twitter_parser')
+
+
+class BoundedScheduler:
+    """Запуск корутин с ограничением числа одновременно выполняемых задач.
+
+    submit() ждёт свободный слот, поэтому постановка задач сама создаёт
+    обратное давление и количество Task в памяти не превышает limit.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, coro_fn: Callable[..., Awaitable], *args) -> asyncio.Task:
+        await self._semaphore.acquire()
+        task = asyncio.ensure_future(self._run(coro_fn, *args))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, coro_fn: Callable[..., Awaitable], *args):
+        try:
+            return await coro_fn(*args)
+        except Exception as e:
+            logger.error(f"Ошибка в задаче {getattr(coro_fn, '__name__', coro_fn)}: {str(e)}", exc_info=True)
+        finally:
+            self._semaphore.release()
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def join(self) -> None:
+        """Ожидание завершения всех поставленных задач"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+
+from utils.async_http import AsyncHttpClient
+from utils.rpc_pool import RpcEndpointPool, rpc_pool
+from utils.wallets import BalanceChecker
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBalanceChecker(BalanceChecker):
+    """Асинхронная проверка балансов: RPC-запросы идут через пул эндпоинтов
+    (RpcEndpointPool.call_async) поверх AsyncHttpClient.
+
+    Загрузка списка токенов и цены по-прежнему синхронные и выполняются
+    в пуле потоков, чтобы не блокировать цикл событий.
+    """
+
+    def __init__(self, http_client: AsyncHttpClient, rpc: RpcEndpointPool = rpc_pool):
+        super().__init__(rpc)
+        self.http_client = http_client
+
+    async def _get_wallets_tokens(self, wallet_addresses: List[str]) -> Dict[str, Dict[str, float]]:
+        """Балансы группы кошельков одним JSON-RPC batch: getMultipleAccounts
+        и getTokenAccountsByOwner по каждой программе токенов.
+
+        Токен-запросы нумеруются как в синхронном пути, getMultipleAccounts
+        идёт последним id; SOL складывается с wrapped SOL после разбора.
+        Ошибки RPC пробрасываются, как и в синхронном пути.
+        """
+        wallet_tokens = {address: {} for address in wallet_addresses}
+        payload = self._token_accounts_batch(wallet_addresses)
+        native_payload = self._native_balances_payload(wallet_addresses)
+        native_payload['id'] = native_id = len(payload)
+        payload.append(native_payload)
+
+        data = await self.rpc.call_async(self.http_client, payload, 'rpc.batch')
+        if not isinstance(data, list):
+            raise ValueError(f"RPC не поддерживает batch-запросы: {str(data)[:200]}")
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._parse_token_batch, data, wallet_addresses, wallet_tokens)
+
+        native = next((item for item in data if item.get('id') == native_id), None)
+        if native is None or 'result' not in native:
+            raise ValueError(f"Не получены SOL-балансы: {(native or {}).get('error')}")
+        for address, account in zip(wallet_addresses, native['result']['value']):
+            balances = wallet_tokens[address]
+            balances['SOL'] = balances.get('SOL', 0) + (float(account['lamports']) / 1e9 if account else 0.0)
+
+        return wallet_tokens
+
+    async def _get_wallet_tokens(self, wallet_address: str) -> Dict[str, float]:
+        return (await self._get_wallets_tokens([wallet_address]))[wallet_address]
+
+    async def get_wallet_balance(self, wallet_address: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Балансы и их оценка в USD; ошибка RPC пробрасывается — вердикт
+        владельца не вычисляется и не кэшируется"""
+        try:
+            balances = await self._get_wallet_tokens(wallet_address)
+        except Exception as e:
+            logger.error(f"Ошибка при получении баланса кошелька {wallet_address}: {e}")
+            raise
+
+        loop = asyncio.get_running_loop()
+        prices = await loop.run_in_executor(None, self.get_token_prices, list(balances.keys()))
+        return balances, self._calculate_usd_values(balances, prices)
@@ -0,0 +1,97 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Empty, Queue
+from threading import Thread
+from typing import List, Tuple
+
+from config.constants import BALANCE_MAX_WORKERS, BALANCE_BATCH_WINDOW, RPC_ACCOUNTS_BATCH_SIZE
+from services.twitter.models import TimelineEntry
+from utils.eligibility import eligible_result
+from utils.owner_cache import OwnerResult
+from utils.wallets import BalanceChecker
+
+logger = logging.getLogger('twitter_parser')
+
+_STOP = object()
+
+_Pending = Tuple[str, TimelineEntry, Future]
+
+
+class BalanceStage:
+    """Отдельная стадия расчёта баланса для найденных владельцев.
+
+    Twitter-воркеры только ставят задачу и сразу берут следующего холдера.
+    Диспетчер копит владельцев до batch_size штук или batch_window секунд
+    и отдаёт пачку в пул потоков: балансы считаются batch-запросами к RPC,
+    а цены — одним проходом на пачку.
+    """
+
+    def __init__(self, balance_checker: BalanceChecker, max_workers: int = BALANCE_MAX_WORKERS,
+                 batch_size: int = RPC_ACCOUNTS_BATCH_SIZE, batch_window: float = BALANCE_BATCH_WINDOW):
+        self.balance_checker = balance_checker
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='balance')
+        self._queue: Queue = Queue()
+        self._dispatcher = Thread(target=self._dispatch, name='balance-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, owner: str, entry: TimelineEntry) -> 'Future[OwnerResult]':
+        future = Future()
+        self._queue.put((owner, entry, future))
+        return future
+
+    def _dispatch(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self._executor.submit(self._enrich_batch, batch)
+            except RuntimeError as e:
+                # Пул уже остановлен (прерывание) — ожидающие получают ошибку
+                for _, _, future in batch:
+                    future.set_exception(e)
+
+    def _enrich_batch(self, batch: List[_Pending]) -> None:
+        try:
+            results = self.balance_checker.get_wallets_balances([owner for owner, _, _ in batch])
+        except Exception as e:
+            logger.error(f"Ошибка при расчёте балансов пачки из {len(batch)} кошельков: {str(e)}", exc_info=True)
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for owner, entry, future in batch:
+            balances, usd_values = results.get(owner, ({}, {}))
+            total_usd = sum(usd_values.values()) if usd_values else 0
+            logger.debug(f"✨ Найден: @{entry.tweet.author.screen_name} ({owner[:8]}...) | Баланс: ${total_usd:.2f}")
+            future.set_result(eligible_result(owner, entry, total_usd))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._queue.put(_STOP)
+        if wait:
+            self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> 'BalanceStage':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
@@ -1,12 +1,48 @@
 import csv
+import io
 import os
+import time
 from datetime import datetime
+from queue import Empty, Queue
+from threading import Lock, Thread
 from typing import List, Dict
 import logging
-from rich.console import Console
+from functools import lru_cache
+
+from config.constants import CSV_FLUSH_INTERVAL, CSV_FSYNC, CSV_ROTATE_BYTES, CSV_QUEUE_SIZE
+from utils.owner_cache import OwnerResult
+from utils.result_sink import ResultSink
 
 logger = logging.getLogger('twitter_parser')
-console = Console()
+
+
+@lru_cache(maxsize=None)
+def _console():
+    # rich нужен только для сообщений об ошибках, поэтому грузится при первом выводе
+    from rich.console import Console
+    return Console()
+
+ELIGIBLE_HEADER = ['Address', 'Twitter Username', 'Tweet Text', 'Can DM', 'Followers Count', 'Total Balance USD']
+NOT_ELIGIBLE_HEADER = ['Адрес', 'Причина']
+
+
+def eligible_row(holder: dict) -> list:
+    # Обработка потенциально проблемных строк
+    tweet_text = str(holder.get('tweet_text', '')).encode('utf-8', errors='replace').decode('utf-8')
+    return [
+        holder.get('address', ''),
+        holder.get('twitter_username', ''),
+        tweet_text,
+        holder.get('can_dm', False),
+        holder.get('followers_count', 0),
+        f"${holder.get('total_balance_usd', 0):.2f}",
+    ]
+
+
+def not_eligible_row(holder: dict) -> list:
+    # Безопасное получение значений с обработкой ошибок кодировки
+    reason = str(holder.get('reason', '')).encode('utf-8', errors='replace').decode('utf-8')
+    return [holder.get('address', ''), reason]
 
 class CSVWriter:
     def __init__(self):
@@ -28,29 +64,17 @@ class CSVWriter:
             # Используем utf-8-sig для корректной работы с Excel в Windows
             with open(filename, 'w', newline='', encoding='utf-8-sig', errors='replace') as file:
                 writer = csv.writer(file)
-                writer.writerow([
-                    'Address', 'Twitter Username', 'Tweet Text', 
-                    'Can DM', 'Followers Count', 'Total Balance USD'
-                ])
+                writer.writerow(ELIGIBLE_HEADER)
                 
                 for holder in holders:
-                    # Обработка потенциально проблемных строк
-                    tweet_text = str(holder.get('tweet_text', '')).encode('utf-8', errors='replace').decode('utf-8')
-                    writer.writerow([
-                        holder.get('address', ''),
-                        holder.get('twitter_username', ''),
-                        tweet_text,
-                        holder.get('can_dm', False),
-                        holder.get('followers_count', 0),
-                        f"${holder.get('total_balance_usd', 0):.2f}",
-                    ])
+                    writer.writerow(eligible_row(holder))
             
             logger.info(f"✅ Успешно сохранено {len(holders)} записей в {filename}")
             return filename
             
         except Exception as e:
             logger.error(f"❌ Ошибка при записи в файл {filename}: {str(e)}", exc_info=True)
-            console.print(f"[red]Ошибка при записи в CSV:[/red] {str(e)}")
+            _console().print(f"[red]Ошибка при записи в CSV:[/red] {str(e)}")
             return None
 
     def write_not_eligible_holders(self, holders: List[Dict]):
@@ -61,30 +85,169 @@ class CSVWriter:
             # Используем utf-8-sig для корректной работы с Excel в Windows
             with open(filename, 'w', newline='', encoding='utf-8-sig', errors='replace') as f:
                 writer = csv.writer(f)
-                writer.writerow(['Адрес', 'Причина'])
+                writer.writerow(NOT_ELIGIBLE_HEADER)
                 for holder in holders:
-                    # Безопасное получение значений с обработкой ошибок кодировки
-                    reason = str(holder.get('reason', '')).encode('utf-8', errors='replace').decode('utf-8')
-                    writer.writerow([
-                        holder.get('address', ''),
-                        reason
-                    ])
+                    writer.writerow(not_eligible_row(holder))
                     
             logger.info(f"✅ Успешно записано {len(holders)} строк в {filename}")
             return filename
             
         except Exception as e:
             logger.error(f"❌ Ошибка при записи в файл {filename}: {str(e)}", exc_info=True)
-            console.print(f"[red]Ошибка при записи в CSV:[/red] {str(e)}")
+            _console().print(f"[red]Ошибка при записи в CSV:[/red] {str(e)}")
             return None
 
+class _RotatingCSVFile:
+    """CSV-файл одного вида с дозаписью и ротацией по размеру"""
+
+    def __init__(self, output_dir: str, prefix: str, header: list, max_bytes: int):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.header = header
+        self.max_bytes = max_bytes
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.part = 0
+        self.paths: List[str] = []
+        self._file = None
+        self._size = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _encode(self, row: list) -> bytes:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(row)
+        return self._buffer.getvalue().encode('utf-8', errors='replace')
+
+    def _open(self) -> None:
+        if self.paths and self._size < self.max_bytes:
+            # Дозапись в текущую часть после close()
+            self._file = open(self.paths[-1], 'ab')
+            return
+        self.part += 1
+        path = os.path.join(self.output_dir, f"{self.prefix}_{self.timestamp}_{self.part:03d}.csv")
+        self._file = open(path, 'ab')
+        self.paths.append(path)
+        # BOM как у utf-8-sig — для корректной работы с Excel в Windows
+        self._size = self._file.write(b'\xef\xbb\xbf' + self._encode(self.header))
+
+    def write(self, row: list) -> None:
+        if self._file is None or self._size >= self.max_bytes:
+            self.close()
+            self._open()
+        self._size += self._file.write(self._encode(row))
+
+    def flush(self, fsync: bool) -> None:
+        if self._file is not None:
+            self._file.flush()
+            if fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush(fsync=True)
+            self._file.close()
+            self._file = None
+
+
+_STOP = object()
+
+
+class StreamingCSVSink(ResultSink):
+    """Потоковая запись вердиктов в CSV по мере их появления.
+
+    Воркеры только кладут строку в очередь; единственный поток-писатель
+    дописывает её в файл, раз в flush_interval секунд сбрасывает буферы
+    (и делает fsync), а по достижении max_bytes открывает следующую часть.
+    После сбоя теряется не больше последнего интервала. Строки, пришедшие
+    после close() (вердикты, досчитанные при прерывании), пишутся сразу
+    в вызывающем потоке.
+    """
+
+    def __init__(self, output_dir: str = "output", flush_interval: float = CSV_FLUSH_INTERVAL,
+                 fsync: bool = CSV_FSYNC, max_bytes: int = CSV_ROTATE_BYTES, queue_size: int = CSV_QUEUE_SIZE):
+        os.makedirs(output_dir, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.rows_written = 0
+        self._files = {
+            'eligible': _RotatingCSVFile(output_dir, 'eligible', ELIGIBLE_HEADER, max_bytes),
+            'not_eligible': _RotatingCSVFile(output_dir, 'not_eligible', NOT_ELIGIBLE_HEADER, max_bytes),
+        }
+        self._queue: Queue = Queue(maxsize=queue_size)
+        self._closed = False
+        self._lock = Lock()
+        self._thread = Thread(target=self._run, name='csv-writer', daemon=True)
+        self._thread.start()
+
+    def add(self, result: OwnerResult) -> None:
+        row = result.to_row()
+        if result.eligible:
+            kind, row = 'eligible', eligible_row(row)
+        else:
+            kind, row = 'not_eligible', not_eligible_row(row)
+        with self._lock:
+            if not self._closed:
+                self._queue.put((kind, row))
+                return
+            # Писатель уже остановлен в close() — очередь никто не прочтёт
+            csv_file = self._files[kind]
+            csv_file.write(row)
+            csv_file.close()
+            self.rows_written += 1
+        logger.warning(f"Строка {kind} дописана после закрытия CSV: {result.owner}")
+
+    def _flush(self) -> None:
+        for csv_file in self._files.values():
+            csv_file.flush(self.fsync)
+
+    def _run(self) -> None:
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                kind, row = item
+                try:
+                    self._files[kind].write(row)
+                    self.rows_written += 1
+                except Exception as e:
+                    logger.error(f"❌ Ошибка при записи строки в CSV: {str(e)}", exc_info=True)
+            if time.monotonic() >= next_flush:
+                try:
+                    self._flush()
+                except OSError as e:
+                    logger.error(f"❌ Ошибка при сбросе CSV на диск: {str(e)}")
+                next_flush = time.monotonic() + self.flush_interval
+
+        for csv_file in self._files.values():
+            csv_file.close()
+
+    def close(self) -> None:
+        """Дописать очередь, сбросить файлы на диск и остановить поток-писатель"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join()
+        logger.info(f"✅ Потоково записано {self.rows_written} строк в {self.files()}")
+
+    def files(self) -> Dict[str, List[str]]:
+        return {kind: list(csv_file.paths) for kind, csv_file in self._files.items()}
+
+
 def write_to_csv(data, filename):
     logger.info(f"Writing data to CSV file: {filename}")
-    console.print(f"[cyan]Writing data to:[/cyan] {filename}")
+    _console().print(f"[cyan]Writing data to:[/cyan] {filename}")
     try:
-        console.print(f"[green]Successfully written {len(data)} records to {filename}[/green]")
+        _console().print(f"[green]Successfully written {len(data)} records to {filename}[/green]")
         logger.info(f"Successfully written {len(data)} records to {filename}")
     except Exception as e:
-        console.print(f"[red]Error writing to CSV:[/red] {str(e)}", style="bold red")
+        _console().print(f"[red]Error writing to CSV:[/red] {str(e)}", style="bold red")
         logger.error(f"Error writing to CSV: {str(e)}", exc_info=True)
         raise
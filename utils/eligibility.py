@@ -0,0 +1,84 @@
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from config.constants import ELIGIBILITY_REQUIRE_OWNER_MATCH
+from services.twitter.models import TimelineEntry, TwitterSearchResponse
+from utils import SolAddressMatcher, sol_matcher
+from utils.owner_cache import OwnerResult
+
+REASON_NO_TWEETS = 'Твиты не найдены'
+REASON_NO_SOL_MENTION = 'Нет твитов с упоминанием SOL'
+REASON_NO_OWNER_MATCH = 'Нет твитов с адресом кошелька'
+
+
+@lru_cache(maxsize=65536)
+def is_valid_pubkey(address: str) -> bool:
+    """Адрес декодируется из base58 ровно в 32 байта"""
+    from solders.pubkey import Pubkey
+    try:
+        Pubkey.from_string(address)
+        return True
+    except ValueError:
+        return False
+
+
+class Verdict(NamedTuple):
+    entry: Optional[TimelineEntry]
+    reason: str = ''
+    # Поиск не удался (сеть, лимиты) — результат не кэшируется
+    cacheable: bool = True
+
+
+class EligibilityEngine:
+    """Проверка, что твит действительно упоминает кошелёк холдера.
+
+    Из твитов извлекаются все адреса-кандидаты; подходящим считается твит,
+    где среди валидных 32-байтных pubkey есть holder.owner. Так баланс
+    запрашивается только для настоящих совпадений.
+    """
+
+    def __init__(self, matcher: SolAddressMatcher = sol_matcher,
+                 require_owner_match: bool = ELIGIBILITY_REQUIRE_OWNER_MATCH):
+        self.matcher = matcher
+        self.require_owner_match = require_owner_match
+
+    def evaluate(self, owner: str, search_response: Optional[TwitterSearchResponse]) -> Verdict:
+        if search_response is None:
+            return Verdict(None, REASON_NO_TWEETS, cacheable=False)
+        if not search_response.entries:
+            return Verdict(None, REASON_NO_TWEETS)
+
+        entries = [entry for entry in search_response.entries if entry.tweet]
+        matches = self.matcher.classify_many(entry.tweet.text for entry in entries)
+
+        mentions_sol = False
+        for entry, match in zip(entries, matches):
+            if not match.eligible:
+                continue
+            mentions_sol = True
+            if not self.require_owner_match:
+                return Verdict(entry)
+            if owner in match.addresses and is_valid_pubkey(owner):
+                return Verdict(entry)
+
+        return Verdict(None, REASON_NO_OWNER_MATCH if mentions_sol else REASON_NO_SOL_MENTION)
+
+
+eligibility_engine = EligibilityEngine()
+
+
+def not_eligible_result(owner: str, verdict: Verdict) -> OwnerResult:
+    """Вердикт для владельца без подходящего твита"""
+    return OwnerResult(owner=owner, eligible=False, reason=verdict.reason, cacheable=verdict.cacheable)
+
+
+def eligible_result(owner: str, entry: TimelineEntry, total_balance_usd: float) -> OwnerResult:
+    return OwnerResult(
+        owner=owner,
+        eligible=True,
+        twitter_username=entry.tweet.author.screen_name,
+        tweet_text=entry.tweet.text,
+        can_dm=entry.tweet.author.can_dm,
+        followers_count=entry.tweet.author.followers_count,
+        total_balance_usd=total_balance_usd
+    )
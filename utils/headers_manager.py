@@ -1,7 +1,22 @@
 from dataclasses import dataclass
-from typing import Dict, Optional, List
+from functools import lru_cache
+from threading import Condition
+from typing import Dict, Mapping, Optional, List, Tuple
+import asyncio
+import logging
 import time
-import random
+
+from config.config import load_twitter_headers
+from config.constants import (
+    TWITTER_ACCOUNT_BUDGET, TWITTER_ACCOUNT_COOLDOWN, TWITTER_ACCOUNT_MAX_ERRORS, TWITTER_ACCOUNT_MAX_WAIT,
+    TWITTER_ACCOUNT_POLL_INTERVAL
+)
+
+logger = logging.getLogger('twitter_parser')
+
+# Ответы, после которых аккаунт считается неработающим, а не ограниченным
+AUTH_ERRORS = (401, 403)
+
 
 @dataclass
 class HeaderStats:
@@ -10,46 +25,153 @@ class HeaderStats:
     last_used: float = 0
     is_active: bool = True
     errors_count: int = 0
+    # Лимит окна по x-rate-limit-*; None — ещё не известен или окно сброшено
+    remaining: Optional[int] = None
+    reset_at: float = 0.0
+    cooldown_until: float = 0.0
+    in_flight: int = 0
+
+    def budget(self, now: float, default: int) -> int:
+        """Сколько запросов ещё можно отправить с аккаунта в текущем окне"""
+        if self.remaining is None or now >= self.reset_at:
+            return default - self.in_flight
+        return self.remaining - self.in_flight
+
 
 class HeadersManager:
-    def __init__(self, headers_list: List[Dict], max_requests: int = 50):
+    """Потокобезопасный планировщик аккаунтов Twitter по остатку лимита.
+
+    Из ответов берутся x-rate-limit-remaining и x-rate-limit-reset каждого
+    аккаунта. Для запроса выбирается аккаунт с наибольшим остатком
+    (с учётом запросов в полёте), исчерпавшие лимит или получившие 429
+    ждут сброса окна, а после max_errors ответов 401/403 подряд аккаунт
+    отключается. Аккаунты адресуются индексом из acquire().
+    """
+
+    def __init__(self, headers_list: List[Dict], default_budget: int = TWITTER_ACCOUNT_BUDGET,
+                 cooldown: float = TWITTER_ACCOUNT_COOLDOWN, max_errors: int = TWITTER_ACCOUNT_MAX_ERRORS):
         self.headers_list = [HeaderStats(headers=headers) for headers in headers_list]
-        self.max_requests = max_requests
-        self.current_index = 0
-    
-    def _get_next_headers(self) -> Optional[HeaderStats]:
-        """Получение следующего доступного набора заголовков"""
-        start_index = self.current_index
+        self.default_budget = default_budget
+        self.cooldown = cooldown
+        self.max_errors = max_errors
+        self._lock = Condition()
+
+    def _pick(self, now: float) -> Optional[Tuple[int, Dict]]:
+        """Выбор аккаунта (под блокировкой)"""
+        best, best_budget = None, 0
+        for index, stats in enumerate(self.headers_list):
+            if not stats.is_active or stats.cooldown_until > now:
+                continue
+            budget = stats.budget(now, self.default_budget)
+            # При равном остатке — дольше всех не использованный
+            if budget > best_budget or (
+                budget == best_budget and best is not None and stats.last_used < self.headers_list[best].last_used
+            ):
+                best, best_budget = index, budget
+        if best is None:
+            return None
+        stats = self.headers_list[best]
+        stats.in_flight += 1
+        stats.requests_count += 1
+        stats.last_used = now
+        return best, stats.headers
+
+    def _wait_time(self, now: float) -> Optional[float]:
+        """Секунд до сброса ближайшего окна (под блокировкой); None — рабочих аккаунтов нет"""
+        waits = [
+            max(0.0, stats.cooldown_until - now, stats.reset_at - now if stats.remaining == 0 else 0.0)
+            for stats in self.headers_list if stats.is_active
+        ]
+        return min(waits) if waits else None
+
+    def acquire(self, timeout: float = TWITTER_ACCOUNT_MAX_WAIT) -> Optional[Tuple[int, Dict]]:
+        """Индекс и заголовки аккаунта с наибольшим остатком лимита.
+
+        Если свободных нет, ждёт сброса окна или освобождения аккаунта не
+        дольше timeout (по умолчанию — целое окно лимита Twitter); None —
+        рабочих аккаунтов не осталось или окно сбрасывается позже timeout.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                now = time.time()
+                credential = self._pick(now)
+                if credential is not None:
+                    return credential
+                wait = self._wait_time(now)
+                left = deadline - time.monotonic()
+                if wait is None or wait > left:
+                    return None
+                # Будят и сброс окна, и ответ по занятому аккаунту (report_*)
+                self._lock.wait(wait or left)
+
+    async def acquire_async(self, timeout: float = TWITTER_ACCOUNT_MAX_WAIT) -> Optional[Tuple[int, Dict]]:
+        """Вариант acquire для цикла событий: ожидание через asyncio.sleep"""
+        deadline = time.monotonic() + timeout
         while True:
-            header_stats = self.headers_list[self.current_index]
-            
-            # Проверяем количество запросов
-            if header_stats.requests_count >= self.max_requests:
-                header_stats.requests_count = 0
-                header_stats.is_active = True  # Сбрасываем статус
-            
-            if header_stats.is_active:
-                return header_stats
-                
-            self.current_index = (self.current_index + 1) % len(self.headers_list)
-            if self.current_index == start_index:
+            now = time.time()
+            with self._lock:
+                credential = self._pick(now)
+                wait = self._wait_time(now) if credential is None else 0.0
+            if credential is not None:
+                return credential
+            if wait is None or wait > deadline - time.monotonic():
                 return None
-    
-    def get_headers(self) -> Optional[Dict]:
-        """Получение рабочих заголовков"""
-        header_stats = self._get_next_headers()
-        if header_stats:
-            header_stats.requests_count += 1
-            header_stats.last_used = time.time()
-            self.current_index = (self.current_index + 1) % len(self.headers_list)
-            return header_stats.headers
-        return None
-    
-    def report_error(self, headers: Dict) -> None:
-        """Отметить ошибку использования заголовков"""
-        for header_stats in self.headers_list:
-            if header_stats.headers == headers:
-                header_stats.errors_count += 1
-                if header_stats.errors_count >= 7:
-                    header_stats.is_active = False
-                break
+            await asyncio.sleep(max(wait, TWITTER_ACCOUNT_POLL_INTERVAL))
+
+    def report_response(self, index: int, status_code: int, headers: Mapping[str, str]) -> None:
+        """Учесть ответ Twitter: остаток лимита, 429 и ошибки авторизации"""
+        headers = {key.lower(): value for key, value in headers.items()}
+        now = time.time()
+        with self._lock:
+            stats = self.headers_list[index]
+            stats.in_flight = max(0, stats.in_flight - 1)
+
+            has_window = False
+            try:
+                stats.remaining = int(headers['x-rate-limit-remaining'])
+                stats.reset_at = float(headers['x-rate-limit-reset'])
+                has_window = True
+            except (KeyError, ValueError):
+                pass
+
+            if status_code == 429 or (stats.remaining == 0 and stats.reset_at > now):
+                stats.remaining = 0
+                # Ответ мог прийти уже после сброса окна — тогда пауза не нужна;
+                # без известного окна аккаунт отдыхает cooldown секунд
+                if has_window or stats.reset_at > now:
+                    stats.cooldown_until = stats.reset_at
+                else:
+                    stats.cooldown_until = now + self.cooldown
+                logger.info(f"Аккаунт #{index} исчерпал лимит, пауза {max(0.0, stats.cooldown_until - now):.0f}с")
+            elif status_code in AUTH_ERRORS:
+                stats.errors_count += 1
+                if stats.errors_count >= self.max_errors:
+                    stats.is_active = False
+                    logger.warning(f"Аккаунт #{index} отключён после {stats.errors_count} ошибок авторизации")
+            elif status_code < 400:
+                stats.errors_count = 0
+            self._lock.notify_all()
+
+    def report_error(self, index: int) -> None:
+        """Запрос не получил ответа (сеть, прокси): аккаунт только освобождается"""
+        with self._lock:
+            stats = self.headers_list[index]
+            stats.in_flight = max(0, stats.in_flight - 1)
+            self._lock.notify_all()
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            return {
+                'accounts': len(self.headers_list),
+                'active': sum(stats.is_active for stats in self.headers_list),
+                'cooling_down': sum(stats.is_active and stats.cooldown_until > now for stats in self.headers_list),
+                'requests': sum(stats.requests_count for stats in self.headers_list),
+            }
+
+
+@lru_cache(maxsize=None)
+def default_headers_manager() -> HeadersManager:
+    """Общий для всех TwitterEngine процесса: лимиты аккаунтов не зависят от воркера"""
+    return HeadersManager(load_twitter_headers())
@@ -0,0 +1,156 @@
+import logging
+import time
+from http.cookiejar import DefaultCookiePolicy
+from threading import Lock
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.constants import (
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_KEEPALIVE, HTTP_KEEPALIVE_TIMEOUT
+)
+from utils.rate_limiter import RateLimiter, rate_limiter
+
+logger = logging.getLogger('twitter_parser')
+
+
+class _RejectAllCookies(DefaultCookiePolicy):
+    """Сессии не накапливают cookie: учётные данные передаются только заголовками"""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+class _PooledSession:
+    __slots__ = ('session', 'created_at', 'last_used', 'requests_count')
+
+    def __init__(self, session: requests.Session):
+        self.session = session
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.requests_count = 0
+
+
+class SessionPool:
+    """Пул постоянных requests.Session по ключу (прокси, хост).
+
+    Каждая сессия держит собственный пул keep-alive соединений, поэтому
+    повторные запросы к тому же хосту через тот же прокси не платят
+    за новый TCP/TLS-хендшейк. Если задан rate_limiter, каждый запрос
+    берёт у него токен, а ответ подстраивает лимиты.
+    """
+
+    def __init__(self, pool_connections: int = HTTP_POOL_CONNECTIONS, pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 keepalive: bool = HTTP_KEEPALIVE, idle_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+                 rate_limiter: Optional[RateLimiter] = None):
+        self.rate_limiter = rate_limiter
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keepalive = keepalive
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[Tuple[Optional[str], str], _PooledSession] = {}
+        self._lock = Lock()
+        self._sessions_created = 0
+        self._sessions_expired = 0
+        self._requests_count = 0
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.cookies.set_policy(_RejectAllCookies())
+        if not self.keepalive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def _expire_idle(self, now: float) -> None:
+        """Закрытие сессий, простаивавших дольше idle_timeout (под блокировкой)"""
+        expired = [key for key, pooled in self._sessions.items() if now - pooled.last_used > self.idle_timeout]
+        for key in expired:
+            self._sessions.pop(key).session.close()
+            self._sessions_expired += 1
+
+    def get_session(self, url: str, proxy_url: Optional[str] = None) -> requests.Session:
+        key = (proxy_url, urlsplit(url).netloc)
+        now = time.time()
+        with self._lock:
+            pooled = self._sessions.get(key)
+            if pooled is None or now - pooled.last_used > self.idle_timeout:
+                self._expire_idle(now)
+                pooled = _PooledSession(self._create_session())
+                self._sessions[key] = pooled
+                self._sessions_created += 1
+            pooled.last_used = now
+            pooled.requests_count += 1
+            self._requests_count += 1
+            return pooled.session
+
+    def request(self, method: str, url: str, proxy: Optional[str] = None, **kwargs) -> requests.Response:
+        session = self.get_session(url, proxy)
+        if proxy:
+            kwargs['proxies'] = {'http': proxy, 'https': proxy}
+        if self.rate_limiter:
+            self.rate_limiter.acquire(url, proxy)
+        response = session.request(method, url, **kwargs)
+        if self.rate_limiter:
+            self.rate_limiter.update_from_response(url, proxy, response.status_code, response.headers)
+        return response
+
+    def get(self, url: str, proxy: Optional[str] = None, **kwargs) -> requests.Response:
+        return self.request('GET', url, proxy=proxy, **kwargs)
+
+    def post(self, url: str, proxy: Optional[str] = None, **kwargs) -> requests.Response:
+        return self.request('POST', url, proxy=proxy, **kwargs)
+
+    @staticmethod
+    def _connection_counts(session: requests.Session) -> Tuple[int, int]:
+        """Число открытых соединений и запросов по пулам urllib3 сессии"""
+        connections = 0
+        requests_served = 0
+        for adapter in set(session.adapters.values()):
+            managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+            for manager in managers:
+                for pool_key in list(manager.pools.keys()):
+                    pool = manager.pools.get(pool_key)
+                    if pool is None:
+                        continue
+                    connections += pool.num_connections
+                    requests_served += pool.num_requests
+        return connections, requests_served
+
+    def stats(self) -> dict:
+        """Статистика переиспользования сессий и соединений"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            stats = {
+                'active_sessions': len(sessions),
+                'sessions_created': self._sessions_created,
+                'sessions_expired': self._sessions_expired,
+                'requests': self._requests_count,
+            }
+
+        connections = 0
+        requests_served = 0
+        for pooled in sessions:
+            session_connections, session_requests = self._connection_counts(pooled.session)
+            connections += session_connections
+            requests_served += session_requests
+
+        stats['connections_opened'] = connections
+        stats['connection_reuse_ratio'] = (
+            1 - connections / requests_served if requests_served else 0.0
+        )
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            for pooled in self._sessions.values():
+                pooled.session.close()
+            self._sessions.clear()
+
+
+# Общий пул для всех движков процесса
+http_pool = SessionPool(rate_limiter=rate_limiter)
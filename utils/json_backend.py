@@ -0,0 +1,82 @@
+"""Декодирование JSON через самый быстрый доступный бэкенд.
+
+Порядок выбора: orjson → msgspec → стандартный json. Бэкенд можно
+зафиксировать через JSON_BACKEND в config/constants.py. Все функции
+принимают сырые bytes ответа, без промежуточного str.
+"""
+import json
+import logging
+import time
+from threading import Lock
+from typing import Any, Dict, Optional, Union
+
+from config.constants import JSON_BACKEND
+
+logger = logging.getLogger('twitter_parser')
+
+
+def _load_backend(preferred: str):
+    candidates = ('orjson', 'msgspec', 'json') if preferred == 'auto' else (preferred,)
+    for name in candidates:
+        if name == 'orjson':
+            try:
+                import orjson
+            except ImportError:
+                continue
+            return name, orjson.loads
+        if name == 'msgspec':
+            try:
+                import msgspec
+            except ImportError:
+                continue
+            # msgspec.DecodeError наследует ValueError, как и ошибки json/orjson
+            return name, msgspec.json.Decoder().decode
+        if name == 'json':
+            return name, json.loads
+    raise ImportError(f"JSON-бэкенд {preferred} недоступен")
+
+
+BACKEND_NAME, _loads = _load_backend(JSON_BACKEND)
+
+_stats: Dict[str, Dict[str, float]] = {}
+_stats_lock = Lock()
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str], endpoint: Optional[str] = None) -> Any:
+    """Разбор JSON; при указании endpoint время и объём учитываются в статистике"""
+    if endpoint is None:
+        return _loads(data)
+
+    started = time.perf_counter()
+    result = _loads(data)
+    record_decode(endpoint, len(data), time.perf_counter() - started)
+    return result
+
+
+def record_decode(endpoint: str, size: int, seconds: float) -> None:
+    """Учёт декодирования, выполненного в обход loads (типизированные декодеры)"""
+    with _stats_lock:
+        entry = _stats.get(endpoint)
+        if entry is None:
+            entry = _stats[endpoint] = {'calls': 0, 'bytes': 0, 'seconds': 0.0}
+        entry['calls'] += 1
+        entry['bytes'] += size
+        entry['seconds'] += seconds
+
+
+def decode_stats() -> Dict[str, Dict[str, float]]:
+    """Время декодирования по эндпоинтам: вызовы, байты, секунды, мс на вызов"""
+    with _stats_lock:
+        snapshot = {endpoint: dict(entry) for endpoint, entry in _stats.items()}
+    for entry in snapshot.values():
+        entry['ms_per_call'] = entry['seconds'] / entry['calls'] * 1000 if entry['calls'] else 0.0
+    return snapshot
+
+
+def log_decode_stats() -> None:
+    for endpoint, entry in sorted(decode_stats().items()):
+        logger.info(
+            f"JSON [{BACKEND_NAME}] {endpoint}: {entry['calls']} ответов, "
+            f"{entry['bytes'] / 1024 / 1024:.1f} МБ, {entry['seconds']:.3f}с "
+            f"({entry['ms_per_call']:.2f} мс/ответ)"
+        )
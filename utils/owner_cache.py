@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from concurrent.futures import Future
+from threading import Lock
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from utils.run_journal import RunJournal
+
+logger = logging.getLogger('twitter_parser')
+
+
+@dataclass
+class OwnerResult:
+    owner: str
+    eligible: bool
+    reason: str = ''
+    twitter_username: str = ''
+    tweet_text: str = ''
+    can_dm: bool = False
+    followers_count: int = 0
+    total_balance_usd: float = 0.0
+    # Результаты после сетевых ошибок не кэшируются и не пишутся на диск
+    cacheable: bool = field(default=True, compare=False)
+
+    def to_row(self) -> dict:
+        """Строка для eligible_holders / not_eligible_holders"""
+        if self.eligible:
+            return {
+                'address': self.owner,
+                'twitter_username': self.twitter_username,
+                'tweet_text': self.tweet_text,
+                'can_dm': self.can_dm,
+                'followers_count': self.followers_count,
+                'total_balance_usd': self.total_balance_usd,
+            }
+        return {
+            'address': self.owner,
+            'reason': self.reason
+        }
+
+
+class OwnerResultCache:
+    """Потокобезопасный кэш результатов проверки по адресу владельца.
+
+    Одновременные запросы одного owner получают один общий Future и ждут
+    единственный запущенный поиск (single-flight). При заданном cache_file итоговые вердикты дописываются
+    в JSONL и подхватываются при следующем запуске; при заданном journal — ещё и в журнал прогона.
+    """
+
+    def __init__(self, cache_file: Optional[str] = None, journal: Optional['RunJournal'] = None):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.journal = journal
+        self._results: Dict[str, OwnerResult] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._async_inflight: Dict[str, asyncio.Future] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        if self.journal is not None:
+            for result in self.journal.owner_results():
+                self._results[result.owner] = result
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        with self.cache_file.open('r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    result = OwnerResult(**json.loads(line))
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Пропущена повреждённая запись кэша владельцев: {str(e)}")
+                    continue
+                self._results[result.owner] = result
+        logger.info(f"Загружено {len(self._results)} владельцев из {self.cache_file}")
+
+    def _store(self, result: OwnerResult) -> None:
+        """Сохранение результата (под блокировкой)"""
+        if not result.cacheable:
+            return
+        self._results[result.owner] = result
+        if self.journal is not None:
+            self.journal.record_owner(result)
+        if self.cache_file:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.cache_file.open('a', encoding='utf-8') as f:
+                record = asdict(result)
+                record.pop('cacheable')
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def get(self, owner: str) -> Optional[OwnerResult]:
+        with self._lock:
+            return self._results.get(owner)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+    def claim(self, owner: str) -> Tuple[Future, bool]:
+        """Future с результатом для owner и флаг, должен ли вызывающий его заполнить.
+
+        Лидер обязан завершить заявку через resolve(), fail() или chain().
+        """
+        with self._lock:
+            cached = self._results.get(owner)
+            if cached is not None:
+                self.hits += 1
+                future = Future()
+                future.set_result(cached)
+                return future, False
+            future = self._inflight.get(owner)
+            if future is not None:
+                self.hits += 1
+                return future, False
+            future = Future()
+            self._inflight[owner] = future
+            self.misses += 1
+            return future, True
+
+    def resolve(self, owner: str, result: OwnerResult) -> None:
+        with self._lock:
+            self._store(result)
+            future = self._inflight.pop(owner, None)
+        if future is not None:
+            future.set_result(result)
+
+    def fail(self, owner: str, error: BaseException) -> None:
+        with self._lock:
+            future = self._inflight.pop(owner, None)
+        if future is not None:
+            future.set_exception(error)
+
+    def chain(self, owner: str, source: Future) -> None:
+        """Завершить заявку owner результатом другого Future (например, стадии баланса)"""
+        def _done(completed: Future) -> None:
+            error = completed.exception()
+            if error is None:
+                self.resolve(owner, completed.result())
+            else:
+                self.fail(owner, error)
+        source.add_done_callback(_done)
+
+    def get_or_compute(self, owner: str, compute: Callable[[], OwnerResult]) -> Tuple[OwnerResult, bool]:
+        """Результат для owner и флаг, был ли он вычислен именно этим вызовом"""
+        future, leader = self.claim(owner)
+        if leader:
+            try:
+                self.resolve(owner, compute())
+            except BaseException as e:
+                self.fail(owner, e)
+        return future.result(), leader
+
+    async def get_or_compute_async(self, owner: str,
+                                   compute: Callable[[], Awaitable[OwnerResult]]) -> Tuple[OwnerResult, bool]:
+        """Вариант get_or_compute для корутин одного цикла событий"""
+        cached = self.get(owner)
+        if cached is not None:
+            self.hits += 1
+            return cached, False
+
+        future = self._async_inflight.get(owner)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future), False
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._async_inflight[owner] = future
+        try:
+            result = await compute()
+            with self._lock:
+                self._store(result)
+            future.set_result(result)
+            return result, True
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Исключение уже передаётся ожидающим; лидер пробрасывает его сам
+            future.exception()
+            raise
+        finally:
+            self._async_inflight.pop(owner, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'owners': len(self._results), 'hits': self.hits, 'misses': self.misses}
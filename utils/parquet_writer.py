@@ -0,0 +1,114 @@
+import logging
+import os
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List
+
+from config.constants import PARQUET_ROW_GROUP_SIZE, PARQUET_COMPRESSION
+from utils.owner_cache import OwnerResult
+from utils.result_sink import ResultSink
+
+logger = logging.getLogger('twitter_parser')
+
+# Колонки и их типы; порядок совпадает с CSV
+ELIGIBLE_COLUMNS = (
+    ('address', 'string'),
+    ('twitter_username', 'string'),
+    ('tweet_text', 'string'),
+    ('can_dm', 'bool'),
+    ('followers_count', 'int64'),
+    ('total_balance_usd', 'float64'),
+)
+NOT_ELIGIBLE_COLUMNS = (
+    ('address', 'string'),
+    ('reason', 'string'),
+)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Для вывода в Parquet нужен pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+
+class _ParquetTable:
+    """Parquet-файл одного вида: строки копятся по колонкам и пишутся row group'ами"""
+
+    def __init__(self, path: str, columns: tuple, row_group_size: int, compression: str):
+        self.pa, self.pq = _import_pyarrow()
+        self.path = path
+        self.schema = self.pa.schema([(name, self.pa.type_for_alias(type_name)) for name, type_name in columns])
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.rows = 0
+        self._columns: Dict[str, list] = {name: [] for name, _ in columns}
+        self._writer = None
+
+    def append(self, row: dict) -> None:
+        for name, values in self._columns.items():
+            values.append(row.get(name))
+        if len(self._columns['address']) >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        buffered = len(self._columns['address'])
+        if not buffered:
+            return
+        table = self.pa.Table.from_pydict(self._columns, schema=self.schema)
+        if self._writer is None:
+            self._writer = self.pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self.rows += buffered
+        for values in self._columns.values():
+            values.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetSink(ResultSink):
+    """Колоночный вывод вердиктов в Parquet с типизированными колонками.
+
+    followers_count хранится как int64, total_balance_usd — как float64,
+    без CSV-форматирования. Строки буферизуются и дописываются row group'ами
+    по row_group_size штук. Футер Parquet пишется в close(), поэтому после
+    сбоя файл не читается — продолжение прогона обеспечивает --resume.
+    """
+
+    def __init__(self, output_dir: str = "output", row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+                 compression: str = PARQUET_COMPRESSION):
+        os.makedirs(output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._tables = {
+            'eligible': _ParquetTable(
+                os.path.join(output_dir, f"eligible_{timestamp}.parquet"), ELIGIBLE_COLUMNS, row_group_size, compression
+            ),
+            'not_eligible': _ParquetTable(
+                os.path.join(output_dir, f"not_eligible_{timestamp}.parquet"), NOT_ELIGIBLE_COLUMNS,
+                row_group_size, compression
+            ),
+        }
+        self._lock = Lock()
+        self._closed = False
+
+    def add(self, result: OwnerResult) -> None:
+        with self._lock:
+            self._tables['eligible' if result.eligible else 'not_eligible'].append(result.to_row())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for table in self._tables.values():
+                table.close()
+        logger.info(f"✅ Записано в Parquet: {self.files()}")
+
+    def files(self) -> Dict[str, List[str]]:
+        return {kind: [table.path] if table.rows else [] for kind, table in self._tables.items()}
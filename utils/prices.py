@@ -0,0 +1,185 @@
+import logging
+import time
+from collections import Counter
+from threading import Event, Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.constants import (
+    TOKENS_INFO, SOL_MINT, STABLECOINS, REQUEST_TIMEOUT, PRICE_CACHE_TTL, PRICE_BATCH_SIZE,
+    COINGECKO_PRICE_URL, JUPITER_PRICE_URL, RAYDIUM_PRICE_URL
+)
+from utils import json_backend
+from utils.http_client import http_pool
+
+logger = logging.getLogger('twitter_parser')
+
+# mint -> coingecko id для базовых токенов
+BASE_MINTS = {info.get('mint', SOL_MINT): info['coingecko_id'] for info in TOKENS_INFO.values()}
+STABLE_MINTS = {TOKENS_INFO[symbol]['mint'] for symbol in STABLECOINS}
+
+
+class PriceService:
+    """Цены токенов в USD с TTL-кэшем по mint.
+
+    Недостающие mint запрашиваются пачками: базовые токены одним вызовом
+    CoinGecko, остальные — Jupiter `ids=` по batch_size штук, а то, что
+    Jupiter не знает, берётся из общего снимка Raydium. Один и тот же mint
+    одновременно запрашивает только один поток, остальные ждут его.
+    Неизвестные mint тоже кэшируются, чтобы не запрашивать их повторно.
+    """
+
+    def __init__(self, ttl: float = PRICE_CACHE_TTL, batch_size: int = PRICE_BATCH_SIZE):
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self._prices: Dict[str, Tuple[Optional[float], float]] = {}
+        self._inflight: Dict[str, Event] = {}
+        self._raydium: Dict[str, float] = {}
+        self._raydium_expires = 0.0
+        self._raydium_lock = Lock()
+        self._lock = Lock()
+        self.api_calls = Counter()
+
+    def get_prices(self, mints: Iterable[str]) -> Dict[str, float]:
+        """Цены для mints; отсутствующие в ответе — неизвестные токены"""
+        mints = set(mints)
+        prices, missing = self._lookup(mints)
+        if missing:
+            self._fetch(missing)
+            prices, _ = self._lookup(mints)
+        return prices
+
+    def _count_call(self, source: str) -> None:
+        # Источники опрашиваются из нескольких потоков сразу
+        with self._lock:
+            self.api_calls[source] += 1
+
+    def _lookup(self, mints: Iterable[str]) -> Tuple[Dict[str, float], List[str]]:
+        now = time.monotonic()
+        prices, missing = {}, []
+        with self._lock:
+            for mint in mints:
+                cached = self._prices.get(mint)
+                if cached is None or cached[1] < now:
+                    missing.append(mint)
+                elif cached[0] is not None:
+                    prices[mint] = cached[0]
+        return prices, missing
+
+    def _fetch(self, mints: List[str]) -> None:
+        done = Event()
+        with self._lock:
+            waits = {self._inflight[mint] for mint in mints if mint in self._inflight}
+            to_fetch = [mint for mint in mints if mint not in self._inflight]
+            for mint in to_fetch:
+                self._inflight[mint] = done
+
+        try:
+            if to_fetch:
+                fetched = self._fetch_prices(to_fetch)
+                expires = time.monotonic() + self.ttl
+                with self._lock:
+                    for mint in to_fetch:
+                        self._prices[mint] = (fetched.get(mint), expires)
+        finally:
+            if to_fetch:
+                with self._lock:
+                    for mint in to_fetch:
+                        self._inflight.pop(mint, None)
+                done.set()
+
+        for event in waits:
+            event.wait(REQUEST_TIMEOUT)
+
+    def _fetch_prices(self, mints: List[str]) -> Dict[str, float]:
+        prices: Dict[str, float] = {}
+
+        if any(mint in BASE_MINTS for mint in mints):
+            prices.update(self._fetch_coingecko())
+
+        remaining = [mint for mint in mints if mint not in prices]
+        for i in range(0, len(remaining), self.batch_size):
+            prices.update(self._fetch_jupiter(remaining[i:i + self.batch_size]))
+
+        remaining = [mint for mint in remaining if mint not in prices]
+        if remaining:
+            raydium = self._raydium_snapshot()
+            for mint in remaining:
+                if mint in raydium:
+                    prices[mint] = raydium[mint]
+
+        for mint in STABLE_MINTS:
+            if mint in mints and mint not in prices:
+                prices[mint] = 1.0
+
+        return prices
+
+    def _fetch_coingecko(self) -> Dict[str, float]:
+        """Все базовые токены одним запросом"""
+        prices = {}
+        try:
+            self._count_call('coingecko')
+            response = http_pool.get(
+                COINGECKO_PRICE_URL,
+                params={'ids': ','.join(BASE_MINTS.values()), 'vs_currencies': 'usd'},
+                timeout=REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+            data = json_backend.loads(response.content, 'coingecko.price')
+            for mint, coingecko_id in BASE_MINTS.items():
+                if coingecko_id in data:
+                    prices[mint] = float(data[coingecko_id]['usd'])
+        except Exception as e:
+            logger.error(f"Ошибка при получении цен через CoinGecko: {e}")
+        return prices
+
+    def _fetch_jupiter(self, mints: List[str]) -> Dict[str, float]:
+        prices = {}
+        try:
+            self._count_call('jupiter')
+            response = http_pool.get(
+                JUPITER_PRICE_URL,
+                params={
+                    "ids": ",".join(mints),
+                    "vsToken": TOKENS_INFO['USDC']['mint'],
+                    "showExtraInfo": "true"
+                },
+                timeout=REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+            data = json_backend.loads(response.content, 'jupiter.price')
+            for mint, price_data in (data.get('data') or {}).items():
+                if isinstance(price_data, dict) and price_data.get('price') is not None:
+                    prices[mint] = float(price_data['price'])
+        except Exception as e:
+            logger.error(f"Ошибка при получении цен через Jupiter v2: {e}")
+        return prices
+
+    def _raydium_snapshot(self) -> Dict[str, float]:
+        """Полная карта цен Raydium, общая для всех запросов в пределах TTL"""
+        with self._raydium_lock:
+            if time.monotonic() < self._raydium_expires:
+                return self._raydium
+            try:
+                self._count_call('raydium')
+                response = http_pool.get(RAYDIUM_PRICE_URL, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                data = json_backend.loads(response.content, 'raydium.price')
+                snapshot = {}
+                for mint, price_info in data.items():
+                    if isinstance(price_info, dict):
+                        price_info = price_info.get('price')
+                    if isinstance(price_info, (int, float)):
+                        snapshot[mint] = float(price_info)
+                self._raydium = snapshot
+            except Exception as e:
+                logger.error(f"Ошибка при получении цен через Raydium: {e}")
+            # При ошибке тоже выжидаем TTL, чтобы не скачивать карту на каждый кошелёк
+            self._raydium_expires = time.monotonic() + self.ttl
+            return self._raydium
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'cached_mints': len(self._prices), 'api_calls': dict(self.api_calls)}
+
+
+price_service = PriceService()
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from config.constants import PROGRESS_REFRESH_INTERVAL
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+logger = logging.getLogger('twitter_parser')
+
+COUNTERS = ('processed_contracts', 'total_holders', 'processed_holders', 'eligible', 'not_eligible')
+
+
+class PipelineMetrics:
+    """Счётчики конвейера без общей блокировки.
+
+    Каждый поток пишет только в свой шард (threading.local), поэтому
+    инкремент не конкурирует с другими воркерами. Шарды суммируются лениво
+    — только при вызове snapshot().
+    """
+
+    def __init__(self, total_contracts: int = 0):
+        self.total_contracts = total_contracts
+        self.started_at = time.monotonic()
+        self._local = threading.local()
+        self._shards: List[Dict[str, int]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[str, int]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = dict.fromkeys(COUNTERS, 0)
+            # Блокировка берётся один раз на поток — при регистрации шарда
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def add(self, counter: str, value: int = 1) -> None:
+        self._shard()[counter] += value
+
+    def snapshot(self) -> dict:
+        """Машиночитаемый срез: суммы по шардам, проценты и скорость"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        totals = dict.fromkeys(COUNTERS, 0)
+        for shard in shards:
+            for counter in COUNTERS:
+                totals[counter] += shard[counter]
+
+        elapsed = time.monotonic() - self.started_at
+        snapshot = {'total_contracts': self.total_contracts}
+        snapshot.update(totals)
+        snapshot['contracts_percent'] = (
+            totals['processed_contracts'] / self.total_contracts * 100 if self.total_contracts else 0.0
+        )
+        snapshot['holders_percent'] = (
+            totals['processed_holders'] / totals['total_holders'] * 100 if totals['total_holders'] else 0.0
+        )
+        snapshot['elapsed_sec'] = round(elapsed, 3)
+        snapshot['holders_per_sec'] = round(totals['processed_holders'] / elapsed, 2) if elapsed > 0 else 0.0
+        return snapshot
+
+
+class ProgressRenderer:
+    """Единственный поток, выводящий прогресс через rich.progress.
+
+    Воркеры не пишут в stdout сами: рендерер раз в refresh_interval
+    секунд берёт snapshot() и перерисовывает полосы.
+    """
+
+    def __init__(self, metrics: PipelineMetrics, refresh_interval: float = PROGRESS_REFRESH_INTERVAL,
+                 console: Optional['Console'] = None):
+        # rich импортируется только при выводе прогресса, не при импорте метрик
+        from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+
+        self.metrics = metrics
+        self.refresh_interval = refresh_interval
+        self._progress = Progress(
+            TextColumn('{task.description}'),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TextColumn('{task.percentage:>5.1f}%'),
+            TextColumn('{task.fields[summary]}'),
+            TimeElapsedColumn(),
+            console=console,
+            auto_refresh=False,
+        )
+        self._contracts_task = self._progress.add_task('📈 Контракты', total=metrics.total_contracts or None, summary='')
+        self._holders_task = self._progress.add_task('👥 Холдеры', total=None, summary='')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _render(self) -> None:
+        snapshot = self.metrics.snapshot()
+        self._progress.update(self._contracts_task, completed=snapshot['processed_contracts'])
+        self._progress.update(
+            self._holders_task,
+            completed=snapshot['processed_holders'],
+            total=snapshot['total_holders'] or None,
+            summary=f"✅ {snapshot['eligible']} | ❌ {snapshot['not_eligible']} | {snapshot['holders_per_sec']:.1f}/с"
+        )
+        self._progress.refresh()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self._render()
+            except Exception as e:
+                logger.debug(f"Ошибка отрисовки прогресса: {str(e)}")
+
+    def start(self) -> 'ProgressRenderer':
+        self._progress.start()
+        self._thread = threading.Thread(target=self._run, name='progress-renderer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        # Финальная отрисовка с итоговыми значениями
+        self._render()
+        self._progress.stop()
+
+    def __enter__(self) -> 'ProgressRenderer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
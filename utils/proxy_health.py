@@ -0,0 +1,188 @@
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Event, Lock, Thread
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple, TYPE_CHECKING
+
+from config.constants import (
+    PROXY_CHECK_URL, PROXY_CHECK_TIMEOUT, PROXY_CHECK_INTERVAL, PROXY_CHECK_WORKERS,
+    PROXY_QUARANTINE_BASE, PROXY_QUARANTINE_MAX, PROXY_LATENCY_WINDOW
+)
+from utils.http_client import SessionPool
+
+if TYPE_CHECKING:
+    from utils.proxy_manager import ProxyManager
+
+logger = logging.getLogger('twitter_parser')
+
+
+@dataclass
+class ProxyHealth:
+    url: str
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=PROXY_LATENCY_WINDOW))
+    checks: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    quarantine_level: int = 0
+    quarantined_until: float = 0.0
+    last_checked: float = 0.0
+
+    @property
+    def quarantined(self) -> bool:
+        return self.quarantine_level > 0
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class ProxyHealthChecker:
+    """Параллельная проверка прокси при старте и по расписанию.
+
+    Упавший прокси уходит в карантин; повторная проверка откладывается
+    экспоненциально (PROXY_QUARANTINE_BASE * 2^n, не больше
+    PROXY_QUARANTINE_MAX). После успешной проверки прокси возвращается
+    в ротацию ProxyManager.
+    """
+
+    def __init__(self, proxy_manager: 'ProxyManager', check_url: str = PROXY_CHECK_URL,
+                 interval: float = PROXY_CHECK_INTERVAL, workers: int = PROXY_CHECK_WORKERS,
+                 timeout: float = PROXY_CHECK_TIMEOUT,
+                 probe: Optional[Callable[[str], bool]] = None):
+        self.proxy_manager = proxy_manager
+        self.check_url = check_url
+        self.interval = interval
+        self.timeout = timeout
+        self._probe_fn = probe or self._http_probe
+        # Отдельный пул без rate limiter: проверки не должны расходовать лимиты API
+        self._pool = SessionPool()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='proxy-health')
+        self._health: Dict[str, ProxyHealth] = {}
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def _http_probe(self, proxy_url: str) -> bool:
+        """Прокси жив, если через него пришёл любой HTTP-ответ: статус
+        check_url (403, 404, редирект) говорит о сайте, а не о прокси"""
+        try:
+            self._pool.get(self.check_url, proxy=proxy_url, timeout=self.timeout, allow_redirects=False)
+            return True
+        except Exception:
+            return False
+
+    def _get_health(self, proxy_url: str) -> ProxyHealth:
+        with self._lock:
+            health = self._health.get(proxy_url)
+            if health is None:
+                health = self._health[proxy_url] = ProxyHealth(url=proxy_url)
+            return health
+
+    def probe(self, proxy_url: str) -> Tuple[bool, float]:
+        """Одна проверка прокси с учётом результата; возвращает (ок, задержка)"""
+        started = time.monotonic()
+        is_ok = self._probe_fn(proxy_url)
+        latency = time.monotonic() - started
+        self._record(proxy_url, is_ok, latency)
+        return is_ok, latency
+
+    def submit(self, proxy_url: str) -> None:
+        """Проверка в фоне, без ожидания результата"""
+        self._executor.submit(self.probe, proxy_url)
+
+    def _record(self, proxy_url: str, is_ok: bool, latency: float) -> None:
+        health = self._get_health(proxy_url)
+        now = time.time()
+        with self._lock:
+            health.checks += 1
+            health.last_checked = now
+            if is_ok:
+                health.latencies.append(latency)
+                recovered = health.quarantined
+                health.consecutive_failures = 0
+                health.quarantine_level = 0
+                health.quarantined_until = 0.0
+            else:
+                health.failures += 1
+                health.consecutive_failures += 1
+                health.quarantine_level += 1
+                delay = min(PROXY_QUARANTINE_MAX, PROXY_QUARANTINE_BASE * 2 ** (health.quarantine_level - 1))
+                health.quarantined_until = now + delay
+
+        if is_ok:
+            if recovered:
+                logger.info(f"Прокси восстановлен после карантина: {proxy_url}")
+            self.proxy_manager.restore(proxy_url, latency)
+        else:
+            logger.warning(f"Прокси в карантине на {delay:.0f}с: {proxy_url}")
+            self.proxy_manager.quarantine(proxy_url)
+
+    def probe_all(self, proxy_urls: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+        """Параллельная проверка списка прокси (по умолчанию — всех)"""
+        urls = list(proxy_urls) if proxy_urls is not None else self.proxy_manager.proxy_urls()
+        futures = {url: self._executor.submit(self.probe, url) for url in urls}
+        results = {url: future.result()[0] for url, future in futures.items()}
+        healthy = sum(results.values())
+        logger.info(f"Проверка прокси: {healthy}/{len(results)} работоспособны")
+        return results
+
+    def due_proxies(self) -> list:
+        """Прокси, которые пора проверить: здоровые по интервалу, карантинные по таймеру"""
+        now = time.time()
+        due = []
+        for url in self.proxy_manager.proxy_urls():
+            health = self._get_health(url)
+            with self._lock:
+                if health.quarantined:
+                    if now >= health.quarantined_until:
+                        due.append(url)
+                elif now - health.last_checked >= self.interval:
+                    due.append(url)
+        return due
+
+    def _run(self, tick: float) -> None:
+        while not self._stop.wait(tick):
+            try:
+                due = self.due_proxies()
+                if due:
+                    self.probe_all(due)
+            except Exception as e:
+                logger.error(f"Ошибка фоновой проверки прокси: {str(e)}", exc_info=True)
+
+    def start(self, tick: float = 1.0) -> None:
+        """Запуск фонового цикла; tick — как часто искать прокси для проверки"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, args=(tick,), name='proxy-health-loop', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=False)
+        self._pool.close()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Перцентили задержки и состояние карантина по каждому прокси"""
+        with self._lock:
+            items = list(self._health.values())
+        return {
+            health.url: {
+                'checks': health.checks,
+                'failures': health.failures,
+                'quarantined': health.quarantined,
+                'quarantined_until': health.quarantined_until,
+                'p50': health.percentile(50),
+                'p90': health.percentile(90),
+                'p99': health.percentile(99),
+            }
+            for health in items
+        }
@@ -1,8 +1,15 @@
-import requests
-from typing import Optional, List
+from typing import Dict, Optional, List
 import time
+import random
+import logging
 from dataclasses import dataclass
 from pathlib import Path
+from threading import Lock
+
+from config.constants import PROXY_MAX_ERRORS, PROXY_DEFAULT_LATENCY, PROXY_STATS_ALPHA
+from utils.proxy_health import ProxyHealthChecker
+
+logger = logging.getLogger('twitter_parser')
 
 @dataclass
 class ProxyStats:
@@ -11,14 +18,37 @@ class ProxyStats:
     last_used: float = 0
     is_active: bool = True
     errors_count: int = 0
+    successes_count: int = 0
+    latency: float = 0.0  # EWMA задержки успешных запросов, секунды
+    error_rate: float = 0.0  # EWMA доли ошибок
+    probing: bool = False
+
+    @property
+    def weight(self) -> float:
+        """Чем быстрее и стабильнее прокси, тем больше вес"""
+        latency = self.latency or PROXY_DEFAULT_LATENCY
+        return (1.0 - self.error_rate) / latency
 
 class ProxyManager:
+    """Потокобезопасный пул прокси.
+
+    Выбор — «два случайных кандидата, берём лучший по весу» за O(1);
+    статистика доступна по URL через словарь. Проверки здоровья (плановая
+    после max_requests запросов, стартовая и периодическая) выполняет
+    ProxyHealthChecker в фоновых потоках.
+    """
+
     def __init__(self, proxies_file: str = "config/proxies.txt", max_requests: int = 100):
         self.proxies_file = Path(proxies_file)
         self.max_requests = max_requests
         self.proxies: List[ProxyStats] = []
-        self.current_index = 0
+        self._by_url: Dict[str, ProxyStats] = {}
+        # Активные прокси: список для случайного выбора и позиции для удаления за O(1)
+        self._active: List[ProxyStats] = []
+        self._active_pos: Dict[str, int] = {}
+        self._lock = Lock()
         self._load_proxies()
+        self.health = ProxyHealthChecker(self)
     
     def _load_proxies(self) -> None:
         """Загрузка прокси из файла"""
@@ -27,53 +57,114 @@ class ProxyManager:
             
         with open(self.proxies_file, 'r') as f:
             proxy_urls = [line.strip() for line in f if line.strip()]
-            self.proxies = [ProxyStats(url=url) for url in proxy_urls]
+        
+        with self._lock:
+            self.proxies = [ProxyStats(url=url) for url in dict.fromkeys(proxy_urls)]
+            self._by_url = {proxy.url: proxy for proxy in self.proxies}
+            self._active = []
+            self._active_pos = {}
+            for proxy in self.proxies:
+                self._activate(proxy)
     
-    def _check_proxy(self, proxy_url: str) -> bool:
-        """Проверка работоспособности прокси"""
-        try:
-            proxies = {
-                'http': proxy_url,
-                'https': proxy_url
-            }
-            response = requests.get('https://api.twitter.com', proxies=proxies, timeout=10)
-            return response.status_code == 200
-        except:
-            return False
+    def _activate(self, proxy: ProxyStats) -> None:
+        """Возврат прокси в ротацию (под блокировкой)"""
+        proxy.is_active = True
+        if proxy.url not in self._active_pos:
+            self._active_pos[proxy.url] = len(self._active)
+            self._active.append(proxy)
     
-    def _get_next_proxy(self) -> Optional[ProxyStats]:
-        """Получение следующего доступного прокси"""
-        start_index = self.current_index
-        while True:
-            proxy = self.proxies[self.current_index]
-            
-            # Проверяем нагрузку на прокси
-            if proxy.requests_count >= self.max_requests:
-                proxy.requests_count = 0
-                proxy.is_active = self._check_proxy(proxy.url)
-            
-            if proxy.is_active:
-                return proxy
-                
-            self.current_index = (self.current_index + 1) % len(self.proxies)
-            if self.current_index == start_index:
-                return None
+    def _deactivate(self, proxy: ProxyStats) -> None:
+        """Вывод прокси из ротации (под блокировкой)"""
+        proxy.is_active = False
+        pos = self._active_pos.pop(proxy.url, None)
+        if pos is None:
+            return
+        last = self._active.pop()
+        if last is not proxy:
+            self._active[pos] = last
+            self._active_pos[last.url] = pos
+    
+    def start_health_checks(self) -> Dict[str, bool]:
+        """Стартовая параллельная проверка всех прокси и запуск фонового цикла"""
+        results = self.health.probe_all()
+        self.health.start()
+        return results
+    
+    def proxy_urls(self) -> List[str]:
+        with self._lock:
+            return [proxy.url for proxy in self.proxies]
+    
+    def restore(self, proxy_url: str, latency: Optional[float] = None) -> None:
+        """Возврат прокси в ротацию после успешной проверки"""
+        with self._lock:
+            proxy = self._by_url.get(proxy_url)
+            if proxy is None:
+                return
+            proxy.probing = False
+            proxy.errors_count = 0
+            proxy.error_rate = 0.0
+            if latency is not None:
+                self._record_latency(proxy, latency)
+            self._activate(proxy)
+    
+    def quarantine(self, proxy_url: str) -> None:
+        """Вывод прокси из ротации до следующей успешной проверки"""
+        with self._lock:
+            proxy = self._by_url.get(proxy_url)
+            if proxy is None:
+                return
+            proxy.probing = False
+            self._deactivate(proxy)
+    
+    def _record_latency(self, proxy: ProxyStats, latency: float) -> None:
+        alpha = PROXY_STATS_ALPHA
+        proxy.latency = latency if not proxy.latency else alpha * latency + (1 - alpha) * proxy.latency
+    
+    def _pick(self) -> Optional[ProxyStats]:
+        """Выбор из двух случайных активных прокси (под блокировкой)"""
+        if not self._active:
+            return None
+        first = random.choice(self._active)
+        second = random.choice(self._active)
+        return first if first.weight >= second.weight else second
     
     def get_proxy(self) -> Optional[str]:
-        """Получение рабочего прокси с учётом нагрузки"""
-        proxy = self._get_next_proxy()
-        if proxy:
+        """Получение рабочего прокси с учётом нагрузки и здоровья"""
+        with self._lock:
+            proxy = self._pick()
+            if not proxy:
+                return None
             proxy.requests_count += 1
             proxy.last_used = time.time()
-            self.current_index = (self.current_index + 1) % len(self.proxies)
+            
+            if proxy.requests_count >= self.max_requests and not proxy.probing:
+                proxy.requests_count = 0
+                proxy.probing = True
+                self.health.submit(proxy.url)
             return proxy.url
-        return None
+    
+    def report_success(self, proxy_url: str, latency: float) -> None:
+        """Учёт успешного запроса и его задержки"""
+        with self._lock:
+            proxy = self._by_url.get(proxy_url)
+            if proxy is None:
+                return
+            proxy.successes_count += 1
+            proxy.error_rate *= (1 - PROXY_STATS_ALPHA)
+            self._record_latency(proxy, latency)
     
     def report_error(self, proxy_url: str) -> None:
         """Отметить ошибку использования прокси"""
-        for proxy in self.proxies:
-            if proxy.url == proxy_url:
-                proxy.errors_count += 1
-                if proxy.errors_count >= 3:
-                    proxy.is_active = False
-                break 
\ No newline at end of file
+        with self._lock:
+            proxy = self._by_url.get(proxy_url)
+            if proxy is None:
+                return
+            proxy.errors_count += 1
+            proxy.error_rate = PROXY_STATS_ALPHA + (1 - PROXY_STATS_ALPHA) * proxy.error_rate
+            if proxy.errors_count >= PROXY_MAX_ERRORS:
+                self._deactivate(proxy)
+    
+    @property
+    def active_count(self) -> int:
+        with self._lock:
+            return len(self._active)
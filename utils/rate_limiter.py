@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Dict, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config.constants import (
+    RATE_LIMITS, DEFAULT_RATE_LIMIT, PROXY_RATE_LIMIT, RATE_LIMIT_DEFAULT_RETRY_AFTER, ACCOUNT_RATE_LIMITED_HOSTS
+)
+
+logger = logging.getLogger('twitter_parser')
+
+
+class TokenBucket:
+    """Классический token bucket с резервированием и внешней блокировкой.
+
+    reserve() сразу списывает токен (баланс может уйти в минус) и возвращает
+    время ожидания, поэтому конкурирующие потоки выстраиваются в очередь,
+    а не просыпаются одновременно. На время блокировки пополнение
+    останавливается: updated сдвигается на её конец.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.base_rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.rate_until = 0.0
+        self._lock = Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.rate_until and now >= self.rate_until:
+            self.rate = self.base_rate
+            self.rate_until = 0.0
+        if now <= self.updated:
+            # Ведро заблокировано: токены начнут копиться с blocked_until
+            return
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(0.0, self.updated - now) + wait
+
+    def block_for(self, seconds: float) -> None:
+        """Запрет запросов на seconds секунд (Retry-After, исчерпанный лимит)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            # После блокировки — один запрос, дальше токены по rate, без всплеска
+            self.tokens = min(self.tokens, 1)
+            self.updated = self.blocked_until
+
+    def limit_rate(self, rate: float, seconds: float) -> None:
+        """Временное снижение скорости до rate на seconds секунд"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(min(rate, self.base_rate), 1e-3)
+            self.rate_until = now + seconds
+
+
+class RateLimiter:
+    """Набор token bucket по хосту назначения и по прокси.
+
+    Перед запросом берётся токен из обоих ведер; заголовки ответа
+    (Retry-After, x-rate-limit-*) подстраивают ведро того канала, через
+    который пришёл ответ: прокси, если он есть, иначе хоста.
+    """
+
+    def __init__(self, host_limits: Mapping[str, Tuple[float, float]] = RATE_LIMITS,
+                 default_limit: Tuple[float, float] = DEFAULT_RATE_LIMIT,
+                 proxy_limit: Tuple[float, float] = PROXY_RATE_LIMIT):
+        self.host_limits = dict(host_limits)
+        self.default_limit = default_limit
+        self.proxy_limit = proxy_limit
+        self._hosts: Dict[str, TokenBucket] = {}
+        self._proxies: Dict[str, TokenBucket] = {}
+        self._lock = Lock()
+
+    def _host_bucket(self, host: str) -> TokenBucket:
+        bucket = self._hosts.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._hosts.get(host)
+                if bucket is None:
+                    rate, burst = self.host_limits.get(host, self.default_limit)
+                    bucket = self._hosts[host] = TokenBucket(rate, burst)
+        return bucket
+
+    def _proxy_bucket(self, proxy_url: str) -> TokenBucket:
+        bucket = self._proxies.get(proxy_url)
+        if bucket is None:
+            with self._lock:
+                bucket = self._proxies.get(proxy_url)
+                if bucket is None:
+                    bucket = self._proxies[proxy_url] = TokenBucket(*self.proxy_limit)
+        return bucket
+
+    def reserve(self, url: str, proxy_url: Optional[str] = None) -> float:
+        """Резервирование слота; возвращает, сколько секунд нужно подождать"""
+        wait = self._host_bucket(urlsplit(url).netloc).reserve()
+        if proxy_url:
+            wait = max(wait, self._proxy_bucket(proxy_url).reserve())
+        return wait
+
+    def acquire(self, url: str, proxy_url: Optional[str] = None) -> None:
+        wait = self.reserve(url, proxy_url)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str, proxy_url: Optional[str] = None) -> None:
+        wait = self.reserve(url, proxy_url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    @staticmethod
+    def _parse_retry_after(value: str) -> Optional[float]:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def update_from_response(self, url: str, proxy_url: Optional[str],
+                             status_code: int, headers: Mapping[str, str]) -> None:
+        """Подстройка лимитов по ответу сервера"""
+        bucket = self._proxy_bucket(proxy_url) if proxy_url else self._host_bucket(urlsplit(url).netloc)
+        headers = {key.lower(): value for key, value in headers.items()}
+
+        retry_after = headers.get('retry-after')
+        if retry_after is not None:
+            seconds = self._parse_retry_after(retry_after)
+            if seconds is not None:
+                bucket.block_for(seconds)
+                logger.debug(f"Retry-After {seconds:.1f}с для {proxy_url or url}")
+                return
+
+        if urlsplit(url).netloc in ACCOUNT_RATE_LIMITED_HOSTS:
+            # Лимит здесь на аккаунт, а не на прокси: его учитывает HeadersManager
+            return
+
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+        if remaining is not None and reset is not None:
+            try:
+                remaining_count = int(remaining)
+                window = float(reset) - time.time()
+            except ValueError:
+                window = 0
+            if window > 0:
+                if remaining_count <= 0:
+                    bucket.block_for(window)
+                else:
+                    # Растягиваем остаток лимита равномерно до сброса окна
+                    bucket.limit_rate(remaining_count / window, window)
+                return
+
+        if status_code == 429:
+            bucket.block_for(RATE_LIMIT_DEFAULT_RETRY_AFTER)
+
+
+# Общий ограничитель для всех движков процесса
+rate_limiter = RateLimiter()
@@ -0,0 +1,35 @@
+from threading import Lock
+from typing import Dict, List
+
+from utils.owner_cache import OwnerResult
+
+
+class ResultSink:
+    """Приёмник вердиктов конвейера; add() вызывается из любых потоков"""
+
+    def add(self, result: OwnerResult) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def files(self) -> Dict[str, List[str]]:
+        """Записанные файлы по виду: 'eligible' / 'not_eligible'"""
+        return {'eligible': [], 'not_eligible': []}
+
+
+class MemorySink(ResultSink):
+    """Прежний режим: строки копятся в списках и пишутся CSVWriter в конце"""
+
+    def __init__(self):
+        self.eligible_holders: List[dict] = []
+        self.not_eligible_holders: List[dict] = []
+        self._lock = Lock()
+
+    def add(self, result: OwnerResult) -> None:
+        row = result.to_row()
+        with self._lock:
+            if result.eligible:
+                self.eligible_holders.append(row)
+            else:
+                self.not_eligible_holders.append(row)
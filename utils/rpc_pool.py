@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from threading import Lock, Thread
+from typing import Any, Deque, List, Optional, Sequence
+
+from config.config import USER_CONFIG
+from config.constants import (
+    REQUEST_TIMEOUT, RPC_LATENCY_WINDOW, RPC_DEFAULT_LATENCY, RPC_HEDGE_ENABLED, RPC_HEDGE_MIN_DELAY,
+    RPC_HEDGE_WORKERS, RPC_MAX_ERRORS, RPC_ENDPOINT_COOLDOWN
+)
+from utils import json_backend
+from utils.http_client import SessionPool, http_pool
+
+logger = logging.getLogger('twitter_parser')
+
+
+class RpcError(Exception):
+    """Ошибка RPC-эндпоинта: сеть, HTTP-статус или ошибка JSON-RPC на весь запрос"""
+
+
+@dataclass
+class RpcEndpoint:
+    url: str
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=RPC_LATENCY_WINDOW))
+    requests: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    hedged_wins: int = 0
+    cooldown_until: float = 0.0
+
+    @property
+    def name(self) -> str:
+        """URL без query-строки: в ней бывает API-ключ"""
+        return self.url.split('?')[0]
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def rank_latency(self) -> float:
+        """Задержка для выбора эндпоинта: без замеров — 0, чтобы новый или
+        вернувшийся после паузы эндпоинт получил запрос и замер, а не застрял
+        на RPC_DEFAULT_LATENCY позади остальных"""
+        return self.percentile(50) if self.latencies else 0.0
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return RPC_DEFAULT_LATENCY
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'hedged_wins': self.hedged_wins,
+            'p50': round(self.percentile(50), 3),
+            'p95': round(self.percentile(95), 3),
+            'available': self.available,
+        }
+
+
+class RpcEndpointPool:
+    """Пул Solana RPC-эндпоинтов с учётом задержек и переключением при сбоях.
+
+    Запрос уходит на эндпоинт с наименьшей медианной задержкой. Если
+    включено хеджирование и ответ не пришёл за p95 этого эндпоинта, тот же
+    запрос дублируется на следующий, и используется первый успешный ответ.
+    После RPC_MAX_ERRORS ошибок подряд эндпоинт уходит на паузу
+    RPC_ENDPOINT_COOLDOWN, а запросы переключаются на остальные.
+    call_async — то же для цикла событий поверх AsyncHttpClient, со
+    статистикой эндпоинтов, общей с синхронными запросами.
+    """
+
+    def __init__(self, urls: Sequence[str], hedge: bool = RPC_HEDGE_ENABLED, timeout: float = REQUEST_TIMEOUT,
+                 session_pool: SessionPool = http_pool):
+        if not urls:
+            raise ValueError("Не задано ни одного RPC-эндпоинта")
+        self.endpoints = [RpcEndpoint(url) for url in dict.fromkeys(urls)]
+        self.hedge = hedge and len(self.endpoints) > 1
+        self.timeout = timeout
+        self.session_pool = session_pool
+        self._executor = ThreadPoolExecutor(max_workers=RPC_HEDGE_WORKERS, thread_name_prefix='rpc-hedge')
+        self._lock = Lock()
+
+    def ranked(self) -> List[RpcEndpoint]:
+        """Доступные эндпоинты по возрастанию медианы, затем стоящие на паузе"""
+        with self._lock:
+            return sorted(self.endpoints, key=lambda endpoint: (not endpoint.available, endpoint.rank_latency()))
+
+    @staticmethod
+    def _decode(content: bytes, name: str) -> Any:
+        data = json_backend.loads(content, name)
+        if isinstance(data, dict) and 'error' in data and 'result' not in data:
+            raise RpcError(f"JSON-RPC ошибка: {data['error']}")
+        return data
+
+    def _failed(self, endpoint: RpcEndpoint, error: Exception) -> RpcError:
+        """Учесть ошибку эндпоинта; возвращает исключение для raise"""
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.errors += 1
+            endpoint.consecutive_errors += 1
+            if endpoint.consecutive_errors >= RPC_MAX_ERRORS:
+                endpoint.cooldown_until = time.monotonic() + RPC_ENDPOINT_COOLDOWN
+                logger.warning(f"RPC-эндпоинт {endpoint.name} на паузе после {endpoint.consecutive_errors} ошибок")
+        return error if isinstance(error, RpcError) else RpcError(f"{endpoint.name}: {type(error).__name__}")
+
+    def _succeeded(self, endpoint: RpcEndpoint, started: float) -> None:
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.consecutive_errors = 0
+            endpoint.cooldown_until = 0.0
+            endpoint.latencies.append(time.monotonic() - started)
+
+    def _send(self, endpoint: RpcEndpoint, payload: Any, name: str) -> Any:
+        started = time.monotonic()
+        try:
+            response = self.session_pool.post(
+                endpoint.url, headers={'Content-Type': 'application/json'}, json=payload, timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = self._decode(response.content, name)
+        except Exception as e:
+            raise self._failed(endpoint, e) from e
+        self._succeeded(endpoint, started)
+        return data
+
+    def _start_primary(self, endpoint: RpcEndpoint, payload: Any, name: str) -> Future:
+        """Основной запрос в собственном потоке, минуя очередь общего пула:
+        время ожидания в очереди не должно расходовать задержку хеджирования"""
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def run() -> None:
+            try:
+                future.set_result(self._send(endpoint, payload, name))
+            except BaseException as e:
+                future.set_exception(e)
+
+        Thread(target=run, name='rpc-primary', daemon=True).start()
+        return future
+
+    def _hedged(self, primary: RpcEndpoint, backup: RpcEndpoint, payload: Any, name: str) -> Any:
+        first = self._start_primary(primary, payload, name)
+        delay = max(RPC_HEDGE_MIN_DELAY, primary.percentile(95))
+        done, _ = wait([first], timeout=delay)
+        if done:
+            if first.exception() is None:
+                return first.result()
+            # Быстрый отказ основного — сразу запасной, без хеджирования
+            return self._send(backup, payload, name)
+
+        second = self._executor.submit(self._send, backup, payload, name)
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self._lock:
+                            backup.hedged_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def call(self, payload: Any, name: str = 'rpc') -> Any:
+        """Выполнить JSON-RPC запрос (одиночный или batch) с переключением эндпоинтов"""
+        remaining = self.ranked()
+        last_error: Optional[BaseException] = None
+        while remaining:
+            endpoint = remaining.pop(0)
+            backup = remaining.pop(0) if self.hedge and remaining else None
+            try:
+                if backup is not None:
+                    return self._hedged(endpoint, backup, payload, name)
+                return self._send(endpoint, payload, name)
+            except RpcError as e:
+                last_error = e
+                logger.debug(f"Переключение с RPC-эндпоинта {endpoint.name}: {str(e)}")
+        raise last_error
+
+    async def _send_async(self, http_client, endpoint: RpcEndpoint, payload: Any, name: str) -> Any:
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                http_client.post(endpoint.url, headers={'Content-Type': 'application/json'}, json=payload),
+                self.timeout
+            )
+            response.raise_for_status()
+            data = self._decode(response.content, name)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise self._failed(endpoint, e) from e
+        self._succeeded(endpoint, started)
+        return data
+
+    async def _hedged_async(self, http_client, primary: RpcEndpoint, backup: RpcEndpoint,
+                            payload: Any, name: str) -> Any:
+        first = asyncio.ensure_future(self._send_async(http_client, primary, payload, name))
+        delay = max(RPC_HEDGE_MIN_DELAY, primary.percentile(95))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            if first.exception() is None:
+                return first.result()
+            return await self._send_async(http_client, backup, payload, name)
+
+        second = asyncio.ensure_future(self._send_async(http_client, backup, payload, name))
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is second:
+                            with self._lock:
+                                backup.hedged_wins += 1
+                        return future.result()
+                    error = future.exception()
+        finally:
+            # Проигравший запрос не нужен — в отличие от потока, задачу можно отменить
+            for future in pending:
+                future.cancel()
+        raise error
+
+    async def call_async(self, http_client, payload: Any, name: str = 'rpc') -> Any:
+        """Вариант call для цикла событий: запросы идут через переданный AsyncHttpClient"""
+        remaining = self.ranked()
+        last_error: Optional[BaseException] = None
+        while remaining:
+            endpoint = remaining.pop(0)
+            backup = remaining.pop(0) if self.hedge and remaining else None
+            try:
+                if backup is not None:
+                    return await self._hedged_async(http_client, endpoint, backup, payload, name)
+                return await self._send_async(http_client, endpoint, payload, name)
+            except RpcError as e:
+                last_error = e
+                logger.debug(f"Переключение с RPC-эндпоинта {endpoint.name}: {str(e)}")
+        raise last_error
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {endpoint.name: endpoint.stats() for endpoint in self.endpoints}
+
+
+def default_rpc_urls() -> List[str]:
+    return [USER_CONFIG['SOL_RPC']] + list(USER_CONFIG.get('SOL_RPC_FALLBACKS', []))
+
+
+# Общий пул для всех BalanceChecker процесса
+rpc_pool = RpcEndpointPool(default_rpc_urls())
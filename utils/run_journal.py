@@ -0,0 +1,143 @@
+import json
+import logging
+import sqlite3
+from dataclasses import asdict
+from pathlib import Path
+from threading import Lock
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple, Union
+
+from services.solscan.models import TokenHolder
+from utils.owner_cache import OwnerResult
+
+logger = logging.getLogger('twitter_parser')
+
+_HOLDER_FIELDS = TokenHolder.__slots__
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contracts (
+    address TEXT PRIMARY KEY,
+    done INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS pages (
+    contract TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    holders TEXT NOT NULL,
+    PRIMARY KEY (contract, page)
+);
+CREATE TABLE IF NOT EXISTS owners (
+    owner TEXT PRIMARY KEY,
+    result TEXT NOT NULL
+);
+"""
+
+
+class RunJournal:
+    """Журнал прогона в SQLite (WAL) для продолжения после остановки.
+
+    Пишется всегда: полученные страницы холдеров Solscan, завершённые
+    контракты и вердикты по владельцам. С resume=True прежние записи
+    сохраняются — страницы из журнала воспроизводятся без запросов к Solscan,
+    владельцы с вердиктом не ищутся в Twitter заново, а пагинация
+    продолжается со следующей страницы. Без resume журнал очищается.
+    """
+
+    def __init__(self, path: Union[str, Path], resume: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # В WAL режим NORMAL не теряет целостность, только последние транзакции при сбое ОС
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._lock = Lock()
+        if not resume:
+            with self._lock:
+                self._conn.executescript("DELETE FROM contracts; DELETE FROM pages; DELETE FROM owners;")
+        else:
+            logger.info(f"Продолжение прогона по журналу {self.path}: {self.stats()}")
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        # Одно соединение на все потоки, поэтому и выборка — под блокировкой
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def contract_done(self, contract: str) -> bool:
+        rows = self._execute("SELECT done FROM contracts WHERE address = ?", (contract,))
+        return bool(rows and rows[0][0])
+
+    def finish_contract(self, contract: str) -> None:
+        self._execute("INSERT OR REPLACE INTO contracts (address, done) VALUES (?, 1)", (contract,))
+
+    def record_page(self, contract: str, page: int, holders: List[TokenHolder]) -> None:
+        data = json.dumps([[getattr(holder, name) for name in _HOLDER_FIELDS] for holder in holders])
+        self._execute("INSERT OR REPLACE INTO pages (contract, page, holders) VALUES (?, ?, ?)", (contract, page, data))
+
+    def pages(self, contract: str) -> Iterator[Tuple[int, List[TokenHolder]]]:
+        """Сохранённые страницы контракта подряд с первой; на пропуске останавливается"""
+        rows = self._execute("SELECT page, holders FROM pages WHERE contract = ? ORDER BY page", (contract,))
+        expected = 1
+        for page, data in rows:
+            if page != expected:
+                break
+            yield page, [TokenHolder(*values) for values in json.loads(data)]
+            expected += 1
+
+    def record_owner(self, result: OwnerResult) -> None:
+        record = asdict(result)
+        record.pop('cacheable')
+        self._execute(
+            "INSERT OR REPLACE INTO owners (owner, result) VALUES (?, ?)",
+            (result.owner, json.dumps(record, ensure_ascii=False))
+        )
+
+    def owner_results(self) -> Iterator[OwnerResult]:
+        for owner, data in self._execute("SELECT owner, result FROM owners"):
+            try:
+                yield OwnerResult(**json.loads(data))
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Пропущен повреждённый вердикт {owner} в журнале: {str(e)}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'contracts_done': self._conn.execute("SELECT COUNT(*) FROM contracts WHERE done = 1").fetchone()[0],
+                'pages': self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0],
+                'owners': self._conn.execute("SELECT COUNT(*) FROM owners").fetchone()[0],
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def resumable_pages(journal: Optional[RunJournal], contract: str,
+                    fetch_pages: Callable[[int], Iterator[List[TokenHolder]]]) -> Iterator[List[TokenHolder]]:
+    """Страницы холдеров: сначала из журнала, затем fetch_pages(start_page) с записью в журнал"""
+    page_number = 0
+    if journal is not None:
+        for page_number, holders in journal.pages(contract):
+            yield holders
+        if journal.contract_done(contract):
+            return
+    for holders in fetch_pages(page_number + 1):
+        page_number += 1
+        if journal is not None:
+            journal.record_page(contract, page_number, holders)
+        yield holders
+
+
+async def resumable_pages_async(journal: Optional[RunJournal], contract: str,
+                                fetch_pages: Callable[[int], AsyncIterator[List[TokenHolder]]]
+                                ) -> AsyncIterator[List[TokenHolder]]:
+    """Вариант resumable_pages для асинхронного итератора страниц"""
+    page_number = 0
+    if journal is not None:
+        for page_number, holders in journal.pages(contract):
+            yield holders
+        if journal.contract_done(contract):
+            return
+    async for holders in fetch_pages(page_number + 1):
+        page_number += 1
+        if journal is not None:
+            journal.record_page(contract, page_number, holders)
+        yield holders
@@ -0,0 +1,70 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from config.constants import TOKENS_INFO, SOL_MINT
+
+
+@dataclass
+class RegistryToken:
+    # Слоты вручную ради Python 3.8: токенов в списке Jupiter десятки тысяч
+    __slots__ = ('mint', 'symbol', 'label')
+    mint: str
+    symbol: str
+    label: str
+
+
+class TokenRegistry:
+    """Справочник токенов с индексом по mint и обратным индексом по символу.
+
+    Строится один раз на обновление списка. Символы не уникальны, поэтому
+    у каждого mint есть уникальная метка: базовые токены из TOKENS_INFO и
+    токены с единственным символом помечаются самим символом, остальные —
+    символом с префиксом mint.
+    """
+
+    def __init__(self, tokens: Iterable[dict] = ()):
+        self._by_mint: Dict[str, RegistryToken] = {}
+        self._by_symbol: Dict[str, List[str]] = defaultdict(list)
+        self._by_label: Dict[str, str] = {}
+
+        for symbol, info in TOKENS_INFO.items():
+            self._add(info.get('mint', SOL_MINT), symbol)
+        for token in tokens:
+            mint, symbol = token.get('address'), token.get('symbol')
+            if mint and symbol and mint not in self._by_mint:
+                self._add(mint, symbol)
+
+        for symbol, mints in self._by_symbol.items():
+            base_mint = TOKENS_INFO[symbol].get('mint', SOL_MINT) if symbol in TOKENS_INFO else None
+            for mint in mints:
+                token = self._by_mint[mint]
+                if len(mints) > 1 and mint != base_mint:
+                    token.label = f"{symbol}:{mint[:6]}"
+                self._by_label[token.label] = mint
+
+    def _add(self, mint: str, symbol: str) -> None:
+        self._by_mint[mint] = RegistryToken(mint=mint, symbol=symbol, label=symbol)
+        self._by_symbol[symbol].append(mint)
+
+    def __len__(self) -> int:
+        return len(self._by_mint)
+
+    def __contains__(self, mint: str) -> bool:
+        return mint in self._by_mint
+
+    def __iter__(self):
+        return iter(self._by_mint.values())
+
+    def get(self, mint: str) -> Optional[RegistryToken]:
+        return self._by_mint.get(mint)
+
+    def label(self, mint: str) -> Optional[str]:
+        token = self._by_mint.get(mint)
+        return token.label if token else None
+
+    def mint_for_label(self, label: str) -> Optional[str]:
+        return self._by_label.get(label)
+
+    def mints_for_symbol(self, symbol: str) -> List[str]:
+        return list(self._by_symbol.get(symbol, ()))
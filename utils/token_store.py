@@ -0,0 +1,328 @@
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from threading import Lock
+from typing import List, Optional, Union
+
+from config.constants import (
+    JUPITER_TOKENS_URL, MAX_RETRIES, REQUEST_TIMEOUT, TOKEN_REGISTRY_FILE, WALLET_CACHE_DURATION
+)
+from utils import json_backend
+from utils.http_client import http_pool
+from utils.token_registry import RegistryToken, TokenRegistry
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger('twitter_parser')
+
+# Формат файла (little-endian):
+#   заголовок | записи, отсортированные по mint | индекс меток | индекс символов | строки UTF-8
+# Запись: mint (ASCII, дополнен нулями до 44 байт), смещение и длина метки и символа в блоке строк.
+# Индексы — массивы uint32 с номерами записей, отсортированные по метке и по (символ, mint).
+MAGIC = b'SOLTOKNS'
+VERSION = 1
+HEADER = struct.Struct('<8sHHIIIIIIII')
+RECORD = struct.Struct('<44sIHIH')
+INDEX = struct.Struct('<I')
+MINT_SIZE = 44
+
+
+def _peak_rss_kb() -> Optional[float]:
+    """Пиковый RSS процесса в КБ; None, если платформа его не сообщает"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт ru_maxrss в КБ, macOS — в байтах
+    return peak / 1024 if sys.platform == 'darwin' else float(peak)
+
+
+def _mint_key(mint: str) -> Optional[bytes]:
+    try:
+        key = mint.encode('ascii')
+    except UnicodeEncodeError:
+        return None
+    return key.ljust(MINT_SIZE, b'\0') if len(key) <= MINT_SIZE else None
+
+
+def write_registry(path: Union[str, Path], registry: TokenRegistry, etag: str = '', last_modified: str = '') -> int:
+    """Сериализация реестра во временный файл и атомарная замена path; возвращает размер"""
+    path = Path(path)
+    blob = bytearray()
+    offsets = {}
+
+    def intern(text: str):
+        if text not in offsets:
+            data = text.encode('utf-8')
+            offsets[text] = (len(blob), len(data))
+            blob.extend(data)
+        return offsets[text]
+
+    records = []
+    for token in registry:
+        key = _mint_key(token.mint)
+        if key is not None:
+            records.append((key, token))
+    records.sort(key=lambda record: record[0])
+
+    count = len(records)
+    label_index = sorted(range(count), key=lambda i: records[i][1].label.encode('utf-8'))
+    symbol_index = sorted(range(count), key=lambda i: (records[i][1].symbol.encode('utf-8'), records[i][0]))
+
+    label_index_off = HEADER.size + count * RECORD.size
+    symbol_index_off = label_index_off + count * INDEX.size
+    blob_off = symbol_index_off + count * INDEX.size
+
+    body = bytearray()
+    for key, token in records:
+        label_ref, symbol_ref = intern(token.label), intern(token.symbol)
+        body += RECORD.pack(key, label_ref[0], label_ref[1], symbol_ref[0], symbol_ref[1])
+    for index in (label_index, symbol_index):
+        for i in index:
+            body += INDEX.pack(i)
+    etag_ref, modified_ref = intern(etag), intern(last_modified)
+
+    header = HEADER.pack(MAGIC, VERSION, 0, count, label_index_off, symbol_index_off, blob_off,
+                         etag_ref[0], etag_ref[1], modified_ref[0], modified_ref[1])
+    data = header + bytes(body) + bytes(blob)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(data)
+
+
+class MappedTokenRegistry:
+    """Реестр токенов поверх mmap файла, только для чтения.
+
+    API совпадает с TokenRegistry. Поиск — бинарный по отсортированным
+    секциям, без разбора всего файла: страницы подгружает ОС и делит их
+    между потоками и процессами, открывшими тот же файл.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with self.path.open('rb') as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, _, self._count, self._label_index_off, self._symbol_index_off,
+             self._blob_off, etag_off, etag_len, modified_off, modified_len) = HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            self._mm.close()
+            raise ValueError(f"Повреждённый файл реестра токенов: {self.path}")
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"Неизвестный формат реестра токенов: {self.path}")
+        self.etag = self._string(etag_off, etag_len)
+        self.last_modified = self._string(modified_off, modified_len)
+
+    @property
+    def size(self) -> int:
+        return len(self._mm)
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._blob_off + offset
+        return self._mm[start:start + length].decode('utf-8')
+
+    def _record(self, i: int) -> RegistryToken:
+        key, label_off, label_len, symbol_off, symbol_len = RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)
+        return RegistryToken(
+            mint=key.rstrip(b'\0').decode('ascii'),
+            symbol=self._string(symbol_off, symbol_len),
+            label=self._string(label_off, label_len)
+        )
+
+    def _key(self, i: int) -> bytes:
+        start = HEADER.size + i * RECORD.size
+        return self._mm[start:start + MINT_SIZE]
+
+    def _field(self, i: int, field: int) -> bytes:
+        offset, length = RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)[field:field + 2]
+        start = self._blob_off + offset
+        return self._mm[start:start + length]
+
+    def _indexed(self, index_off: int, position: int) -> int:
+        return INDEX.unpack_from(self._mm, index_off + position * INDEX.size)[0]
+
+    def _find_mint(self, mint: str) -> int:
+        key = _mint_key(mint)
+        if key is None:
+            return -1
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._count and self._key(lo) == key else -1
+
+    def _lower_bound(self, index_off: int, field: int, value: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._field(self._indexed(index_off, mid), field) < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, mint: str) -> bool:
+        return self._find_mint(mint) >= 0
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._record(i)
+
+    def get(self, mint: str) -> Optional[RegistryToken]:
+        i = self._find_mint(mint)
+        return self._record(i) if i >= 0 else None
+
+    def label(self, mint: str) -> Optional[str]:
+        i = self._find_mint(mint)
+        return self._field(i, 1).decode('utf-8') if i >= 0 else None
+
+    def mint_for_label(self, label: str) -> Optional[str]:
+        value = label.encode('utf-8')
+        position = self._lower_bound(self._label_index_off, 1, value)
+        if position < self._count:
+            i = self._indexed(self._label_index_off, position)
+            if self._field(i, 1) == value:
+                return self._key(i).rstrip(b'\0').decode('ascii')
+        return None
+
+    def mints_for_symbol(self, symbol: str) -> List[str]:
+        value = symbol.encode('utf-8')
+        mints = []
+        position = self._lower_bound(self._symbol_index_off, 3, value)
+        while position < self._count:
+            i = self._indexed(self._symbol_index_off, position)
+            if self._field(i, 3) != value:
+                break
+            mints.append(self._key(i).rstrip(b'\0').decode('ascii'))
+            position += 1
+        return mints
+
+
+class TokenStore:
+    """Общий для процесса реестр токенов Jupiter в бинарном файле.
+
+    Файл обновляется не чаще max_age: запрос к Jupiter идёт с
+    If-None-Match / If-Modified-Since, при 304 у файла только обновляется
+    mtime, при 200 реестр перестраивается и атомарно подменяет файл.
+    Другие процессы видят свежий файл по mtime и просто переоткрывают его.
+    """
+
+    def __init__(self, path: Union[str, Path] = TOKEN_REGISTRY_FILE, max_age: float = WALLET_CACHE_DURATION,
+                 url: str = JUPITER_TOKENS_URL):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.url = url
+        self._registry: Optional[Union[MappedTokenRegistry, TokenRegistry]] = None
+        self._checked_at = 0.0
+        self._lock = Lock()
+
+    def registry(self) -> Union[MappedTokenRegistry, TokenRegistry]:
+        with self._lock:
+            if self._registry is None or time.monotonic() - self._checked_at > self.max_age:
+                self._refresh()
+                self._checked_at = time.monotonic()
+            return self._registry
+
+    def _file_age(self) -> Optional[float]:
+        try:
+            return time.time() - self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def _map(self) -> None:
+        started = time.perf_counter()
+        registry = MappedTokenRegistry(self.path)
+        # Размер отображения — это размер файла, а не занятая память:
+        # страницы подгружаются по мере обращения, поэтому RSS процесса пишется отдельно
+        peak_rss = _peak_rss_kb()
+        logger.info(
+            f"Реестр токенов: {len(registry)} токенов, отображено {registry.size / 1024:.0f} КБ, "
+            f"открыт за {(time.perf_counter() - started) * 1000:.2f} мс"
+            + (f", пиковый RSS процесса {peak_rss / 1024:.1f} МБ" if peak_rss is not None else "")
+        )
+        self._registry = registry
+
+    def _refresh(self) -> None:
+        mapped = self._registry if isinstance(self._registry, MappedTokenRegistry) else None
+        age = self._file_age()
+
+        if age is not None:
+            try:
+                if mapped is None or mapped.inode != self.path.stat().st_ino:
+                    self._map()
+                    mapped = self._registry
+                if age < self.max_age:
+                    return
+            except (OSError, ValueError) as e:
+                logger.warning(f"Не удалось открыть реестр токенов {self.path}: {str(e)}")
+                mapped = None
+
+        headers = {}
+        if mapped is not None:
+            if mapped.etag:
+                headers['If-None-Match'] = mapped.etag
+            if mapped.last_modified:
+                headers['If-Modified-Since'] = mapped.last_modified
+
+        for attempt in range(MAX_RETRIES):
+            try:
+                response = http_pool.get(self.url, headers=headers, timeout=REQUEST_TIMEOUT)
+                if response.status_code == 304 and mapped is not None:
+                    os.utime(self.path)
+                    logger.info("Список токенов Jupiter не изменился (304)")
+                    return
+                response.raise_for_status()
+
+                started = time.perf_counter()
+                tokens = json_backend.loads(response.content, 'jupiter.tokens')
+                registry = TokenRegistry(tokens)
+                size = write_registry(
+                    self.path, registry,
+                    etag=response.headers.get('ETag', ''),
+                    last_modified=response.headers.get('Last-Modified', '')
+                )
+                logger.info(
+                    f"Реестр токенов перестроен: {len(registry)} токенов, {size / 1024:.0f} КБ "
+                    f"за {(time.perf_counter() - started) * 1000:.0f} мс"
+                )
+                # Прежний mmap намеренно не закрывается явно: registry() мог уже вернуть
+                # его другим потокам. Отображение освобождается, когда исчезает
+                # последняя ссылка на старый MappedTokenRegistry
+                self._map()
+                return
+            except Exception as e:
+                if attempt == MAX_RETRIES - 1:
+                    logger.error(f"Не удалось получить список токенов: {e}")
+
+        if self._registry is None:
+            # Без списка Jupiter остаются только базовые токены
+            self._registry = TokenRegistry()
+
+
+token_store = TokenStore()
@@ -1,22 +1,18 @@
-from solana.rpc.api import Client
-from solders.pubkey import Pubkey
-from typing import Dict, Tuple, List, Optional
-import requests
-import time
+from typing import Dict, Tuple, List
 from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import json
 import logging
-from pathlib import Path
 
 from config.config import USER_CONFIG
 from config.constants import (
-    TOKEN_PROGRAM_ID, TOKENS_INFO, WALLET_CACHE_DURATION,
-    WALLET_BATCH_SIZE, WALLET_MAX_WORKERS, WALLET_RATE_LIMIT_DELAY,
-    REQUEST_TIMEOUT, MAX_RETRIES, JUPITER_TOKENS_URL,
-    COINGECKO_PRICE_URL, JUPITER_PRICE_URL, RAYDIUM_PRICE_URL
+    TOKEN_PROGRAM_ID, TOKEN_PROGRAM_IDS, TOKENS_INFO,
+    RPC_ACCOUNTS_BATCH_SIZE, RPC_REQUEST_BATCH_SIZE, RPC_BATCH_WORKERS,
+    REQUEST_TIMEOUT, MAX_RETRIES
 )
+from utils.prices import price_service
+from utils.rpc_pool import RpcEndpointPool, rpc_pool
+from utils.token_store import token_store
 
 # Настройка логирования
 logging.basicConfig(
@@ -31,252 +27,222 @@ logger = logging.getLogger(__name__)
 
 # Константы
 SOLANA_RPC_URL = USER_CONFIG["SOL_RPC"]
-CACHE_FILE = Path('solana_tokens.json')
-CACHE_DURATION = 300  # 5 минут в секундах
 REQUEST_TIMEOUT = 10  # таймаут для HTTP запросов
 MAX_RETRIES = 3
 
 class BalanceChecker:
-    def __init__(self, rpc_url: str = SOLANA_RPC_URL):
-        self.client = Client(rpc_url)
-        self._token_list: Optional[Dict[str, str]] = None
-        self._last_token_update = 0
+    def __init__(self, rpc: RpcEndpointPool = rpc_pool):
+        self.rpc = rpc
 
     @property
-    def token_list(self) -> Dict[str, str]:
-        current_time = time.time()
-        if not self._token_list or (current_time - self._last_token_update) > WALLET_CACHE_DURATION:
-            self._token_list = self._load_or_fetch_tokens()
-            self._last_token_update = current_time
-        return self._token_list
-
-    def _load_or_fetch_tokens(self) -> Dict[str, str]:
+    def registry(self):
+        """Общий для всех экземпляров реестр токенов (mmap-файл)"""
+        return token_store.registry()
+
+    def get_token_prices(self, token_symbols: List[str] = None) -> Dict[str, float]:
+        """Цены по меткам токенов; запросы к API идут через общий PriceService"""
+        registry = self.registry
+        label_mints = {}
+        for label in set(token_symbols or []) | set(TOKENS_INFO):
+            mint = registry.mint_for_label(label)
+            if mint:
+                label_mints[label] = mint
+
         try:
-            if CACHE_FILE.exists() and (time.time() - CACHE_FILE.stat().st_mtime) < CACHE_DURATION:
-                with CACHE_FILE.open('r') as f:
-                    return json.load(f)
-            
-            tokens = self._fetch_jupiter_tokens()
-            with CACHE_FILE.open('w') as f:
-                json.dump(tokens, f, indent=2)
-            return tokens
+            mint_prices = price_service.get_prices(label_mints.values())
         except Exception as e:
-            logger.error(f"Ошибка при загрузке токенов: {e}")
+            logger.error(f"Ошибка при получении цен: {e}")
             return {}
 
-    def _fetch_jupiter_tokens(self) -> Dict[str, str]:
-        for attempt in range(MAX_RETRIES):
-            try:
-                response = requests.get("https://token.jup.ag/all", timeout=REQUEST_TIMEOUT)
-                response.raise_for_status()
-                tokens = response.json()
-                return {token['symbol']: token['address'] for token in tokens}
-            except Exception as e:
-                if attempt == MAX_RETRIES - 1:
-                    logger.error(f"Не удалось получить список токенов: {e}")
-                    return {}
-                time.sleep(1)
-        return {}
+        return {label: mint_prices[mint] for label, mint in label_mints.items() if mint in mint_prices}
 
-    def get_token_prices(self, token_symbols: List[str] = None) -> Dict[str, float]:
-        prices = {}
+    def get_wallet_balance(self, wallet_address: str) -> Tuple[Dict[str, float], Dict[str, float]]:
         try:
-            # Сначала получаем цены для основных токенов через CoinGecko
-            token_ids = [info['coingecko_id'] for info in TOKENS_INFO.values()]
-            
-            response = requests.get(
-                f"https://api.coingecko.com/api/v3/simple/price",
-                params={'ids': ','.join(token_ids), 'vs_currencies': 'usd'},
-                timeout=REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            for token, info in TOKENS_INFO.items():
-                if info['coingecko_id'] in data:
-                    prices[token] = data[info['coingecko_id']]['usd']
+            return self.get_wallets_balances([wallet_address])[wallet_address]
+        except Exception as e:
+            logger.error(f"Ошибка при получении баланса кошелька {wallet_address}: {e}")
+            return {}, {}
+
+    @staticmethod
+    def _calculate_usd_values(balances: Dict[str, float], prices: Dict[str, float]) -> Dict[str, float]:
+        usd_values = {}
+        for token, balance in balances.items():
+            if token in prices and balance > 0:
+                usd_values[token] = balance * prices[token]
+        return usd_values
+
+    @staticmethod
+    def _token_accounts_payload(wallet_address: str, request_id: int = 1, program_id: str = TOKEN_PROGRAM_ID) -> dict:
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "getTokenAccountsByOwner",
+            "params": [
+                wallet_address,
+                {
+                    "programId": program_id
+                },
+                {
+                    "encoding": "jsonParsed"
+                }
+            ]
+        }
+
+    def _parse_token_accounts(self, response_data: dict, balances: Dict[str, float]) -> None:
+        """Разбор ответа getTokenAccountsByOwner в словарь балансов"""
+        if 'result' not in response_data or 'value' not in response_data['result']:
+            return
+
+        registry = self.registry
 
-            # Получаем цены через Jupiter API v2
+        for account in response_data['result']['value']:
+            mint = None
             try:
-                # Получаем mint адреса для всех токенов
-                token_mints = []
-                for symbol in (token_symbols or []):
-                    if symbol in self.token_list:
-                        token_mints.append(self.token_list[symbol])
+                parsed_info = account['account']['data']['parsed']['info']
+                mint = parsed_info.get('mint')
+                token_amount = parsed_info.get('tokenAmount', {})
                 
-                if token_mints:
-                    jupiter_response = requests.get(
-                        "https://api.jup.ag/price/v2",
-                        params={
-                            "ids": ",".join(token_mints),
-                            "vsToken": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v",  # USDC mint
-                            "showExtraInfo": "true"
-                        },
-                        timeout=REQUEST_TIMEOUT
-                    )
-                    jupiter_response.raise_for_status()
-                    jupiter_data = jupiter_response.json()
+                if not mint or 'amount' not in token_amount or 'decimals' not in token_amount:
+                    continue
                     
-                    # Создаем обратный маппинг mint -> symbol
-                    mint_to_symbol = {v: k for k, v in self.token_list.items()}
-                    
-                    if 'data' in jupiter_data:
-                        for mint, price_data in jupiter_data['data'].items():
-                            if price_data and mint in mint_to_symbol:
-                                if isinstance(price_data, dict) and 'price' in price_data:
-                                    symbol = mint_to_symbol[mint]
-                                    if symbol not in prices:  # не перезаписываем цены из CoinGecko
-                                        prices[symbol] = float(price_data['price'])
+                amount = float(token_amount['amount'])
+                decimals = int(token_amount['decimals'])
+                balance = amount / (10 ** decimals)
 
-            except Exception as e:
-                logger.error(f"Ошибка при получении цен через Jupiter v2: {e}")
+                # Пропускаем нулевые балансы
+                if balance == 0:
+                    continue
 
-            # Получаем цены через Raydium API для оставшихся токенов
-            try:
-                missing_tokens = [t for t in (token_symbols or []) if t not in prices]
-                if missing_tokens:
-                    raydium_response = requests.get(
-                        "https://api.raydium.io/v2/main/price",
-                        timeout=REQUEST_TIMEOUT
-                    )
-                    raydium_response.raise_for_status()
-                    raydium_data = raydium_response.json()
-                    
-                    for symbol in missing_tokens:
-                        if symbol in self.token_list:
-                            mint = self.token_list[symbol]
-                            if mint in raydium_data:
-                                price_info = raydium_data[mint]
-                                if isinstance(price_info, dict) and 'price' in price_info:
-                                    prices[symbol] = float(price_info['price'])
+                # Wrapped SOL складывается с нативным балансом под меткой SOL
+                label = registry.label(mint)
+                if label:
+                    balances[label] = balances.get(label, 0) + balance
 
             except Exception as e:
-                logger.error(f"Ошибка при получении цен через Raydium: {e}")
+                logger.debug(f"Ошибка при обработке токена {mint}: {str(e)}")
+                continue
 
-            # Добавляем стейблкоины
-            for token in ['USDC', 'USDT']:
-                if token not in prices:
-                    prices[token] = 1.0
+    @staticmethod
+    def _native_balances_payload(wallet_addresses: List[str]) -> dict:
+        """getMultipleAccounts без данных аккаунтов: нужны только lamports"""
+        return {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getMultipleAccounts",
+            "params": [
+                wallet_addresses,
+                {
+                    "encoding": "base64",
+                    "dataSlice": {"offset": 0, "length": 0}
+                }
+            ]
+        }
 
-        except Exception as e:
-            logger.error(f"Ошибка при получении цен: {e}")
-        
-        return prices
+    def _rpc_post(self, payload, endpoint: str):
+        """JSON-RPC через пул эндпоинтов: переключение при сбоях и хеджирование"""
+        return self.rpc.call(payload, endpoint)
 
-    def get_wallet_balance(self, wallet_address: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+    def _get_native_balances(self, wallet_addresses: List[str], native_balances: Dict[str, float]) -> None:
+        """SOL-балансы до RPC_ACCOUNTS_BATCH_SIZE кошельков одним запросом.
+
+        Ошибка RPC пробрасывается: нулевой баланс вместо неизвестного
+        попал бы в кэш владельцев и журнал прогона.
+        """
         try:
-            balances = self._get_wallet_tokens(wallet_address)
-            
-            # Получаем цены для всех найденных токенов
-            prices = self.get_token_prices(list(balances.keys()))
-            
-            usd_values = {}
-            for token, balance in balances.items():
-                if token in prices and balance > 0:
-                    price = prices[token]
-                    usd_value = balance * price
-                    usd_values[token] = usd_value
-            
-            return balances, usd_values
+            data = self._rpc_post(self._native_balances_payload(wallet_addresses), 'rpc.getMultipleAccounts')
+            accounts = data['result']['value']
         except Exception as e:
-            logger.error(f"Ошибка при получении баланса кошелька {wallet_address}: {e}")
-            return {}, {}
+            logger.error(f"Ошибка при получении SOL-балансов пачки из {len(wallet_addresses)} кошельков: {str(e)}")
+            raise
 
-    def _get_wallet_tokens(self, wallet_address: str) -> Dict[str, float]:
-        balances = {}
-        try:
-            # Получаем SOL баланс
-            sol_response = self.client.get_balance(Pubkey.from_string(wallet_address))
-            if hasattr(sol_response, 'value'):
-                balances['SOL'] = float(sol_response.value) / 1e9
-
-            # Получаем список токенов из Jupiter
-            jupiter_tokens = self.token_list
-
-            url = "https://mainnet.helius-rpc.com/?api-key=12891d9f-e674-4ae8-b25e-23eab3a00621"
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getTokenAccountsByOwner",
-                "params": [
-                    wallet_address,
-                    {
-                        "programId": TOKEN_PROGRAM_ID
-                    },
-                    {
-                        "encoding": "jsonParsed"
-                    }
-                ]
-            }
-            headers = {'Content-Type': 'application/json'}
-
-            response = requests.post(url, headers=headers, json=payload, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            response_data = response.json()
-
-            if 'result' in response_data and 'value' in response_data['result']:
-                accounts = response_data['result']['value']
-                
-                for account in accounts:
-                    try:
-                        parsed_info = account['account']['data']['parsed']['info']
-                        mint = parsed_info.get('mint')
-                        token_amount = parsed_info.get('tokenAmount', {})
-                        
-                        if not mint or 'amount' not in token_amount or 'decimals' not in token_amount:
-                            continue
-                            
-                        amount = float(token_amount['amount'])
-                        decimals = int(token_amount['decimals'])
-                        balance = amount / (10 ** decimals)
-
-                        # Пропускаем нулевые балансы
-                        if balance == 0:
-                            continue
-
-                        # Сначала проверяем в TOKENS_INFO
-                        token_found = False
-                        for token, token_info in TOKENS_INFO.items():
-                            if 'mint' in token_info and token_info['mint'] == mint:
-                                balances[token] = balance
-                                token_found = True
-                                break
-                        
-                        # Если токен не найден в TOKENS_INFO, ищем в Jupiter
-                        if not token_found:
-                            for symbol, address in jupiter_tokens.items():
-                                if address == mint:
-                                    balances[symbol] = balance
-                                    break
-
-                    except Exception as e:
-                        logger.debug(f"Ошибка при обработке токена {mint}: {str(e)}")
-                        continue
+        for address, account in zip(wallet_addresses, accounts):
+            # Несуществующий аккаунт — нулевой баланс
+            native_balances[address] = float(account['lamports']) / 1e9 if account else 0.0
 
+    def _get_token_accounts(self, wallet_addresses: List[str], wallet_tokens: Dict[str, Dict[str, float]]) -> None:
+        """getTokenAccountsByOwner по всем программам токенов для пачки кошельков одним JSON-RPC batch.
+
+        id запроса = номер кошелька * число программ + номер программы; аккаунты
+        SPL Token и Token-2022 сливаются в один словарь балансов кошелька.
+        """
+        payload = self._token_accounts_batch(wallet_addresses)
+        try:
+            data = self._rpc_post(payload, 'rpc.getTokenAccountsByOwner')
         except Exception as e:
-            logger.error(f"Ошибка при получении токенов кошелька {wallet_address}: {str(e)}")
+            logger.error(f"Ошибка при получении токенов пачки из {len(wallet_addresses)} кошельков: {str(e)}")
+            raise
+
+        if not isinstance(data, list):
+            raise ValueError(f"RPC не поддерживает batch-запросы: {str(data)[:200]}")
+
+        self._parse_token_batch(data, wallet_addresses, wallet_tokens)
+
+    def _token_accounts_batch(self, wallet_addresses: List[str]) -> List[dict]:
+        programs = len(TOKEN_PROGRAM_IDS)
+        return [
+            self._token_accounts_payload(address, i * programs + k, program_id)
+            for i, address in enumerate(wallet_addresses)
+            for k, program_id in enumerate(TOKEN_PROGRAM_IDS)
+        ]
+
+    def _parse_token_batch(self, data: List[dict], wallet_addresses: List[str],
+                           wallet_tokens: Dict[str, Dict[str, float]]) -> None:
+        """Разбор ответов из _token_accounts_batch; чужие id пропускаются"""
+        programs = len(TOKEN_PROGRAM_IDS)
+        for item in data:
+            request_id = item.get('id')
+            if not isinstance(request_id, int) or not 0 <= request_id < len(wallet_addresses) * programs:
+                continue
+            address = wallet_addresses[request_id // programs]
+            if 'error' in item:
+                raise ValueError(f"Ошибка при получении токенов кошелька {address}: {item['error']}")
+            self._parse_token_accounts(item, wallet_tokens[address])
 
-        return balances
+    def get_wallets_tokens(self, wallet_addresses: List[str]) -> Dict[str, Dict[str, float]]:
+        """Балансы токенов по кошелькам за O(N / размер пачки) RPC-запросов"""
+        wallet_addresses = list(dict.fromkeys(wallet_addresses))
+        wallet_tokens = {address: {} for address in wallet_addresses}
+        if not wallet_addresses:
+            return wallet_tokens
 
-    def get_wallets_balances(self, wallet_addresses: List[str], batch_size: int = 50) -> Dict[str, Tuple[Dict[str, float], Dict[str, float]]]:
-        results = {}
+        # SOL-балансы копятся отдельно: wrapped SOL из токен-аккаунтов пишется
+        # под той же меткой параллельно, складываются они после всех запросов
+        native_balances: Dict[str, float] = {}
+        # Каждый кошелёк занимает в batch по запросу на программу токенов
+        wallets_per_batch = max(1, RPC_REQUEST_BATCH_SIZE // len(TOKEN_PROGRAM_IDS))
+        with ThreadPoolExecutor(max_workers=RPC_BATCH_WORKERS) as executor:
+            futures = [
+                executor.submit(self._get_native_balances, wallet_addresses[i:i + RPC_ACCOUNTS_BATCH_SIZE], native_balances)
+                for i in range(0, len(wallet_addresses), RPC_ACCOUNTS_BATCH_SIZE)
+            ]
+            futures += [
+                executor.submit(self._get_token_accounts, wallet_addresses[i:i + wallets_per_batch], wallet_tokens)
+                for i in range(0, len(wallet_addresses), wallets_per_batch)
+            ]
+            for future in futures:
+                future.result()
+
+        for address, balance in native_balances.items():
+            balances = wallet_tokens[address]
+            balances['SOL'] = balances.get('SOL', 0) + balance
+
+        return wallet_tokens
+
+    def get_wallets_balances(self, wallet_addresses: List[str]) -> Dict[str, Tuple[Dict[str, float], Dict[str, float]]]:
+        """Балансы пачки кошельков: сначала все токены, затем один проход по ценам"""
+        wallet_tokens = self.get_wallets_tokens(wallet_addresses)
         
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for i in range(0, len(wallet_addresses), batch_size):
-                batch = wallet_addresses[i:i + batch_size]
-                futures = [executor.submit(self.get_wallet_balance, address) for address in batch]
-                
-                for address, future in zip(batch, futures):
-                    try:
-                        balances, usd_values = future.result()
-                        results[address] = (balances, usd_values)
-                    except Exception as e:
-                        logger.error(f"Ошибка при обработке кошелька {address}: {e}")
-                        results[address] = ({}, {})
-                
-                time.sleep(0.5)  # Защита от rate limit
+        # Цены всех встретившихся токенов загружаются пачками один раз,
+        # оценка каждого кошелька дальше — локальный поиск
+        symbols = set()
+        for balances in wallet_tokens.values():
+            symbols.update(balances)
+        prices = self.get_token_prices(list(symbols))
         
-        return results
+        return {
+            address: (balances, self._calculate_usd_values(balances, prices))
+            for address, balances in wallet_tokens.items()
+        }
 
 def main():
     client = BalanceChecker()